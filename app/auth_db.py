@@ -1,15 +1,36 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, create_engine, text, UniqueConstraint, Float
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, create_engine, text, bindparam, UniqueConstraint, Float, Index, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, object_session, sessionmaker, relationship
 from sqlalchemy.ext.declarative import declarative_base
 import hashlib
+import os
 
-DATABASE_URL = "sqlite:///./users.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./users.db")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+IS_SQLITE = make_url(DATABASE_URL).get_backend_name() == "sqlite"
 
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000} if IS_SQLITE else {}
 )
 
+
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the single writer; with synchronous=NORMAL a commit
+    # no longer waits for an fsync, and busy_timeout makes writers queue instead of
+    # failing with "database is locked".
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.close()
+
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", configure_sqlite_connection)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -37,6 +58,11 @@ class User(Base):
 # ANALYSIS MODEL
 class Analysis(Base):
     __tablename__ = "analysis"
+    __table_args__ = (
+        Index("ix_analysis_user_id_id", "user_id", "id"),
+        # NULL keys never collide, so only requests that sent an idempotency key are deduplicated.
+        Index("uq_analysis_user_idempotency_key", "user_id", "idempotency_key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -44,10 +70,73 @@ class Analysis(Base):
     matched_skills = Column(String)
     missing_skills = Column(String)
     created_at = Column(String, nullable=True)
+    batch_id = Column(Integer, ForeignKey("screening_batches.id"), nullable=True, index=True)
+    candidate_name = Column(String, nullable=True)
+    taxonomy_version = Column(String, nullable=True)
+    idempotency_key = Column(String, nullable=True)
 
     user = relationship("User")
 
 
+SKILL_MISSING = 0
+SKILL_MATCHED = 1
+
+
+class Skill(Base):
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+# ANALYSIS SKILL: one row per skill an analysis matched or missed. user_id and created_at are
+# copied from the analysis so per-user skill-gap queries are answered from one covering index.
+class AnalysisSkill(Base):
+    __tablename__ = "analysis_skill"
+    __table_args__ = (
+        Index("ix_analysis_skill_gaps", "user_id", "status", "skill_id", "created_at"),
+        {"sqlite_with_rowid": False},
+    )
+
+    analysis_id = Column(Integer, ForeignKey("analysis.id"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+    status = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    created_at = Column(String, nullable=True)
+
+
+# HR SCREENING BATCH: one job description screened against many resumes (Analysis rows with batch_id)
+class ScreeningBatch(Base):
+    __tablename__ = "screening_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    job_description = Column(String)
+    candidate_count = Column(Integer, default=0)
+    created_at = Column(String, nullable=True)
+
+    user = relationship("User")
+
+
+# ANALYSIS JOB: an /analyze/ request accepted in job mode, processed by app.jobs workers
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (Index("uq_analysis_jobs_user_idempotency_key", "user_id", "idempotency_key", unique=True),)
+
+    id = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    status = Column(String, nullable=False, default="queued", index=True)
+    stage = Column(String, nullable=False, default="queued")
+    filename = Column(String)
+    spool_path = Column(String)
+    job_description = Column(String)
+    result = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(Float)
+    updated_at = Column(Float)
+    idempotency_key = Column(String, nullable=True)
+
+
 class Application(Base):
     __tablename__ = "applications"
 
@@ -64,81 +153,71 @@ class Application(Base):
     user = relationship("User")
 
 
-# CREATE TABLES
-Base.metadata.create_all(bind=engine)
-
-
-def ensure_schema():
-    with engine.connect() as conn:
-        columns = {row[1] for row in conn.execute(text("PRAGMA table_info(users)")).fetchall()}
-        if "linkedin_url" not in columns:
-            conn.execute(text("ALTER TABLE users ADD COLUMN linkedin_url VARCHAR"))
-            conn.commit()
-        if "role" not in columns:
-            conn.execute(text("ALTER TABLE users ADD COLUMN role VARCHAR DEFAULT 'job_seeker'"))
-            conn.execute(text("UPDATE users SET role = 'job_seeker' WHERE role IS NULL OR role = ''"))
-            conn.commit()
-        indexes = conn.execute(text("PRAGMA index_list(users)")).fetchall()
-        has_old_unique_email = False
-        has_composite_unique = False
-        for idx in indexes:
-            idx_name = idx[1]
-            is_unique = idx[2] == 1
-            if not is_unique:
-                continue
-            idx_cols = [row[2] for row in conn.execute(text(f"PRAGMA index_info('{idx_name}')")).fetchall()]
-            if idx_cols == ["email"]:
-                has_old_unique_email = True
-            if idx_cols == ["email", "role"]:
-                has_composite_unique = True
-        if has_old_unique_email or not has_composite_unique:
-            conn.execute(text("PRAGMA foreign_keys=OFF"))
-            conn.execute(
-                text(
-                    """
-                    CREATE TABLE users_new (
-                        id INTEGER PRIMARY KEY,
-                        email VARCHAR NOT NULL,
-                        hashed_password VARCHAR,
-                        linkedin_url VARCHAR,
-                        role VARCHAR NOT NULL DEFAULT 'job_seeker'
-                    )
-                    """
-                )
-            )
-            conn.execute(
-                text(
-                    """
-                    INSERT INTO users_new (id, email, hashed_password, linkedin_url, role)
-                    SELECT id, lower(trim(email)), hashed_password, linkedin_url, COALESCE(NULLIF(role, ''), 'job_seeker')
-                    FROM users
-                    """
-                )
-            )
-            conn.execute(text("CREATE UNIQUE INDEX uq_users_email_role ON users_new(email, role)"))
-            conn.execute(text("CREATE INDEX ix_users_email ON users_new(email)"))
-            conn.execute(text("DROP TABLE users"))
-            conn.execute(text("ALTER TABLE users_new RENAME TO users"))
-            conn.execute(text("PRAGMA foreign_keys=ON"))
-            conn.commit()
-
-        # Migrate analysis table
-        analysis_cols = {row[1] for row in conn.execute(text("PRAGMA table_info(analysis)")).fetchall()}
-        if "created_at" not in analysis_cols:
-            conn.execute(text("ALTER TABLE analysis ADD COLUMN created_at VARCHAR"))
-            conn.commit()
-
-        # Migrate applications table
-        app_cols = {row[1] for row in conn.execute(text("PRAGMA table_info(applications)")).fetchall()}
-        if "date_applied" not in app_cols:
-            conn.execute(text("ALTER TABLE applications ADD COLUMN date_applied VARCHAR"))
-            conn.commit()
-        if "interview_date" not in app_cols:
-            conn.execute(text("ALTER TABLE applications ADD COLUMN interview_date VARCHAR"))
-            conn.commit()
-
-
-ensure_schema()
+_skill_id_cache = {}
+PENDING_SKILL_IDS = "pending_skill_ids"
+
+
+def get_skill_ids(connection, names, pending=None):
+    """Map skill names to ids, inserting missing skills.
+
+    Ids looked up in this transaction may belong to rows it inserted itself, and
+    SQLite hands those ids out again after a rollback. They are only recorded in
+    ``pending`` and reach the shared cache once the session commits.
+    """
+    cache = _skill_id_cache.setdefault(connection.engine, {})
+    ids = {name: cache[name] for name in names if name in cache}
+    unknown = [name for name in names if name not in ids]
+    if unknown:
+        select_ids = text("SELECT name, id FROM skills WHERE name IN :names").bindparams(bindparam("names", expanding=True))
+        ids.update(connection.execute(select_ids, {"names": unknown}).fetchall())
+        new_names = [name for name in unknown if name not in ids]
+        if new_names:
+            connection.execute(text("INSERT OR IGNORE INTO skills (name) VALUES (:name)"), [{"name": name} for name in new_names])
+            ids.update(connection.execute(select_ids, {"names": new_names}).fetchall())
+        if pending is not None:
+            pending.setdefault(connection.engine, {}).update((name, ids[name]) for name in unknown)
+    return ids
+
+
+def analysis_skill_rows(connection, analysis_id, user_id, created_at, matched_skills, missing_skills, pending=None):
+    statuses = {}
+    for name in (missing_skills or "").split(", "):
+        if name:
+            statuses[name] = SKILL_MISSING
+    for name in (matched_skills or "").split(", "):
+        if name:
+            statuses[name] = SKILL_MATCHED
+    if not statuses:
+        return []
+    skill_ids = get_skill_ids(connection, list(statuses), pending)
+    return [
+        {"analysis_id": analysis_id, "skill_id": skill_ids[name], "status": status, "user_id": user_id, "created_at": created_at}
+        for name, status in statuses.items()
+    ]
+
+
+@event.listens_for(Analysis, "after_insert")
+def write_analysis_skills(mapper, connection, analysis):
+    # Every insert path (direct, screening batches, write-behind) goes through the ORM, so the
+    # normalized rows are written here, in the same transaction as the analysis.
+    pending = object_session(analysis).info.setdefault(PENDING_SKILL_IDS, {})
+    rows = analysis_skill_rows(
+        connection, analysis.id, analysis.user_id, analysis.created_at, analysis.matched_skills, analysis.missing_skills, pending
+    )
+    if rows:
+        connection.execute(AnalysisSkill.__table__.insert(), rows)
+
+
+@event.listens_for(Session, "after_commit")
+def cache_committed_skill_ids(session):
+    for bind, ids in session.info.pop(PENDING_SKILL_IDS, {}).items():
+        _skill_id_cache.setdefault(bind, {}).update(ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_pending_skill_ids(session):
+    session.info.pop(PENDING_SKILL_IDS, None)
+
 
 def get_db():
     db = SessionLocal()
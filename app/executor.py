@@ -0,0 +1,93 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+
+from app.metrics import registry, run_captured
+from app.profiler import bind_profile
+
+WORKER_MODE = os.getenv("RESUME_WORKER_MODE", "thread")
+WORKER_COUNT = int(os.getenv("RESUME_WORKERS", str(os.cpu_count() or 2)))
+QUEUE_SIZE = int(os.getenv("RESUME_QUEUE_SIZE", "16"))
+SCREENING_WORKER_MODE = os.getenv("SCREENING_WORKER_MODE", "process")
+SCREENING_BATCHES = int(os.getenv("SCREENING_BATCHES", "2"))
+RETRY_AFTER_SECONDS = 5
+
+
+class QueueFull(Exception):
+    pass
+
+
+class BoundedExecutor:
+    """Thread or process pool with admission control.
+
+    At most ``workers + queue_size`` jobs are admitted at once. Callers take a
+    slot before submitting work and get ``QueueFull`` immediately when none is
+    free, so overload is answered fast instead of piling up on the pool.
+    """
+
+    def __init__(self, mode=WORKER_MODE, workers=WORKER_COUNT, queue_size=QUEUE_SIZE):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown worker mode: {mode}")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def _get_pool(self):
+        # Created lazily so importing the app (or forking workers) does not spawn pool processes.
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    if self.mode == "process":
+                        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="resume-worker")
+        return self._pool
+
+    @asynccontextmanager
+    async def slot(self):
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull()
+        self._in_flight += 1
+        try:
+            yield self
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        if self.mode == "process":
+            result, samples = await loop.run_in_executor(self._get_pool(), partial(run_captured, fn, args, kwargs))
+            registry.merge(samples)
+            return result
+        return await loop.run_in_executor(self._get_pool(), bind_profile(partial(fn, *args, **kwargs)))
+
+    def call(self, fn, *args, **kwargs):
+        # Blocking variant for background threads that do their own admission control.
+        if self.mode == "process":
+            result, samples = self._get_pool().submit(run_captured, fn, args, kwargs).result()
+            registry.merge(samples)
+            return result
+        return self._get_pool().submit(fn, *args, **kwargs).result()
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+analysis_executor = BoundedExecutor()
+# Bulk screening fans a whole batch out over its own pool; each batch takes one slot.
+screening_executor = BoundedExecutor(mode=SCREENING_WORKER_MODE, queue_size=SCREENING_BATCHES - 1)
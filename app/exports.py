@@ -0,0 +1,91 @@
+"""Streaming CSV and JSON Lines exports of a user's analyses and applications.
+
+Rows are read in keyset batches (``id > last_id ORDER BY id LIMIT n``), each
+in its own short session, and encoded batch by batch, so memory stays flat
+however long the history is. Only the exported columns are selected, which
+keeps ORM objects out of the identity map. With gzip on, the encoded chunks
+go through one streaming compressor.
+"""
+import csv
+import io
+import json
+import os
+import zlib
+
+from app.auth_db import Analysis, Application, SessionLocal
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "jsonl": "application/x-ndjson"}
+EXPORT_DATASETS = {
+    "analyses": (
+        Analysis,
+        ("id", "created_at", "score", "matched_skills", "missing_skills", "batch_id", "candidate_name", "taxonomy_version"),
+    ),
+    "applications": (
+        Application,
+        ("id", "company", "role", "status", "date_applied", "interview_date", "job_link", "notes"),
+    ),
+}
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def keyset_batches(model, columns, user_id, batch_size=EXPORT_BATCH_SIZE, session_factory=SessionLocal):
+    """Yield lists of row tuples owned by ``user_id`` in id order, ``batch_size`` at a time."""
+    selected = [getattr(model, column) for column in columns]
+    last_id = 0
+    while True:
+        db = session_factory()
+        try:
+            rows = (
+                db.query(*selected)
+                .filter(model.user_id == user_id, model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+                .all()
+            )
+        finally:
+            db.close()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        # "id" is always the first exported column.
+        last_id = rows[-1][0]
+
+
+def encode_csv(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header only: the user has nothing to export yet.
+        yield buffer.getvalue().encode("utf-8")
+
+
+def encode_jsonl(columns, batches):
+    for rows in batches:
+        yield "".join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+ENCODERS = {"csv": encode_csv, "jsonl": encode_jsonl}
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, GZIP_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(dataset, fmt, user_id, gzip=False):
+    model, columns = EXPORT_DATASETS[dataset]
+    chunks = ENCODERS[fmt](columns, keyset_batches(model, columns, user_id))
+    return gzip_chunks(chunks) if gzip else chunks
@@ -0,0 +1,172 @@
+"""Document text extractors and the format registry that dispatches to them.
+
+Formats are detected from the file's leading bytes first and only fall back
+to the filename suffix for formats without a signature (plain text). Parser
+backends are imported inside the extractor, so a worker that never sees a
+PDF never imports PyPDF2. New formats register themselves with
+``register_extractor``; the dispatcher does not change. A sniffer gets the
+leading bytes and, for ZIP containers, the member names, read once per file.
+"""
+import io
+import os
+import re
+import zipfile
+from collections import namedtuple
+from xml.etree import ElementTree as ET
+
+from app.metrics import PAGES_PARSED, STAGE_SECONDS
+
+# Bump whenever extraction output changes so cached text from older extractors is not reused.
+EXTRACTOR_VERSION = "3"
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "50"))
+MAX_EXTRACT_CHARS = int(os.getenv("MAX_EXTRACT_CHARS", "200000"))
+SNIFF_BYTES = 2048
+ZIP_SIGNATURE = b"PK\x03\x04"
+UTF8_BOM = b"\xef\xbb\xbf"
+
+Extractor = namedtuple("Extractor", ["name", "suffixes", "sniff", "extract"])
+EXTRACTORS = []
+
+
+def register_extractor(name, suffixes=(), sniff=None):
+    def decorator(extract):
+        EXTRACTORS.append(Extractor(name, tuple(suffixes), sniff, extract))
+        return extract
+
+    return decorator
+
+
+def zip_members(file_obj):
+    try:
+        with zipfile.ZipFile(file_obj) as archive:
+            return set(archive.namelist())
+    except zipfile.BadZipFile:
+        return set()
+    finally:
+        file_obj.seek(0)
+
+
+def is_pdf(head, members):
+    # Only a leading header counts; a text resume that mentions "%PDF-" is still text.
+    return head.removeprefix(UTF8_BOM).lstrip().startswith(b"%PDF-")
+
+
+def is_docx(head, members):
+    return "word/document.xml" in members
+
+
+def is_odt(head, members):
+    return "content.xml" in members
+
+
+def is_rtf(head, members):
+    return head.lstrip().startswith(b"{\\rtf")
+
+
+def iter_pdf_pages(file, max_pages=None, max_chars=None):
+    # extract_text() is the expensive PyPDF2 call, so each page is extracted exactly once
+    # and iteration stops as soon as the page or character budget is spent.
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(file)
+    remaining_chars = max_chars
+    for page_number, page in enumerate(reader.pages):
+        if max_pages is not None and page_number >= max_pages:
+            return
+        page_text = page.extract_text()
+        PAGES_PARSED.inc()
+        if not page_text:
+            continue
+        if remaining_chars is not None:
+            if len(page_text) >= remaining_chars:
+                yield page_text[:remaining_chars]
+                return
+            remaining_chars -= len(page_text)
+        yield page_text
+
+
+@register_extractor("pdf", suffixes=(".pdf",), sniff=is_pdf)
+def extract_text_from_pdf(file, max_pages=MAX_PDF_PAGES, max_chars=MAX_EXTRACT_CHARS):
+    return "\n".join(iter_pdf_pages(file, max_pages=max_pages, max_chars=max_chars))
+
+
+@register_extractor("docx", suffixes=(".docx",), sniff=is_docx)
+def extract_text_from_docx(file):
+    file.seek(0)
+    with zipfile.ZipFile(io.BytesIO(file.read())) as archive:
+        with archive.open("word/document.xml") as doc_xml:
+            xml_content = doc_xml.read()
+    root = ET.fromstring(xml_content)
+    text_nodes = []
+    for node in root.iter():
+        if node.tag.endswith("}t") and node.text:
+            text_nodes.append(node.text)
+    return " ".join(text_nodes)
+
+
+@register_extractor("odt", suffixes=(".odt",), sniff=is_odt)
+def extract_text_from_odt(file):
+    file.seek(0)
+    with zipfile.ZipFile(io.BytesIO(file.read())) as archive:
+        with archive.open("content.xml") as content_xml:
+            xml_content = content_xml.read()
+    root = ET.fromstring(xml_content)
+    text_nodes = []
+    for node in root.iter():
+        if node.text and node.text.strip():
+            text_nodes.append(node.text.strip())
+    return " ".join(text_nodes)
+
+
+@register_extractor("rtf", suffixes=(".rtf",), sniff=is_rtf)
+def extract_text_from_rtf(file):
+    raw = file.read()
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        text = raw.decode("latin-1", errors="ignore")
+    text = re.sub(r"\\'[0-9a-fA-F]{2}", " ", text)
+    text = re.sub(r"\\[a-zA-Z]+\d* ?", " ", text)
+    text = re.sub(r"[{}]", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+# Plain text has no signature, so it is only chosen by suffix after every sniffer declined.
+@register_extractor("txt", suffixes=(".txt", ".md"))
+def extract_text_from_txt(file):
+    raw = file.read()
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1", errors="ignore")
+
+
+def detect_format(file_obj, filename=""):
+    file_obj.seek(0)
+    head = file_obj.read(SNIFF_BYTES)
+    file_obj.seek(0)
+    members = zip_members(file_obj) if head.startswith(ZIP_SIGNATURE) else set()
+    for extractor in EXTRACTORS:
+        if extractor.sniff and extractor.sniff(head, members):
+            return extractor
+    suffix = os.path.splitext((filename or "").lower())[1]
+    for extractor in EXTRACTORS:
+        if suffix in extractor.suffixes:
+            return extractor
+    return None
+
+
+def detect_format_name(filename, data):
+    # Part of every cache key: txt/md are chosen by suffix, so the same bytes can be supported or not.
+    extractor = detect_format(io.BytesIO(data), filename)
+    return extractor.name if extractor else None
+
+
+def extract_text_from_file(filename, file_obj):
+    extractor = detect_format(file_obj, filename)
+    if extractor is None:
+        raise ValueError("Unsupported file type. Use PDF, DOCX, ODT, TXT, MD, or RTF.")
+    file_obj.seek(0)
+    with STAGE_SECONDS.time("extraction", extractor.name):
+        return extractor.extract(file_obj)
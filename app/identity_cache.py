@@ -0,0 +1,44 @@
+import os
+from collections import namedtuple
+
+from app.cache import LRUCache
+
+IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", "60"))
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "5000"))
+
+# Detached snapshot of the User columns routes read; safe to share between requests and sessions.
+CachedUser = namedtuple("CachedUser", ["id", "email", "role", "linkedin_url"])
+
+
+class IdentityCache:
+    """Per-process cache of user identities keyed by id and by (email, role).
+
+    Entries expire after a short TTL so other workers pick up profile changes;
+    writers in this process invalidate explicitly.
+    """
+
+    def __init__(self, ttl=IDENTITY_CACHE_TTL, max_items=IDENTITY_CACHE_SIZE):
+        self.entries = LRUCache(max_items=max_items, ttl=ttl)
+
+    def get(self, user_id):
+        return self.entries.get(("id", user_id))
+
+    def get_by_email(self, email, role):
+        return self.entries.get(("email", email, role))
+
+    def put(self, user):
+        cached = CachedUser(user.id, user.email, user.role or "job_seeker", user.linkedin_url)
+        self.entries.set(("id", cached.id), cached)
+        self.entries.set(("email", cached.email, cached.role), cached)
+        return cached
+
+    def invalidate(self, user_id=None, email=None, role=None):
+        if user_id is not None:
+            cached = self.entries.pop(("id", user_id))
+            if cached is not None:
+                self.entries.pop(("email", cached.email, cached.role))
+        if email is not None and role is not None:
+            self.entries.pop(("email", email, role))
+
+
+identity_cache = IdentityCache()
@@ -0,0 +1,235 @@
+"""Background analysis jobs: spooled uploads, a SQLite job table and an in-process worker pool.
+
+A job-mode request only spools the upload to disk, inserts a ``queued`` row
+and returns the job ID, so its duration does not depend on the document.
+Worker threads claim jobs with a conditional UPDATE, which keeps a job from
+running twice when several processes resume the same table, and record every
+stage as it finishes. Queued jobs, and running jobs whose lease expired
+because their process died, are picked up again on startup.
+"""
+import json
+import logging
+import os
+import queue
+import secrets
+import shutil
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError
+
+from app.auth_db import AnalysisJob, SessionLocal
+from app.cache import LRUCache
+from app.executor import QueueFull
+
+JOB_SPOOL_DIR = os.getenv("ANALYSIS_JOB_SPOOL_DIR", "./job_spool")
+JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.getenv("ANALYSIS_JOB_MAX_PENDING", "100"))
+JOB_RETENTION_SECONDS = 60 * 60 * 24 * 7
+JOB_LEASE_SECONDS = 600
+JOB_STAGES = ("queued", "extracting", "scoring", "saving", "done")
+
+logger = logging.getLogger(__name__)
+
+
+class JobFailed(Exception):
+    """Raised by a handler with a message that is safe to show to the user."""
+
+
+class JobRunner:
+    def __init__(self, handler, session_factory=SessionLocal, workers=JOB_WORKERS, spool_dir=JOB_SPOOL_DIR):
+        self.handler = handler
+        self.session_factory = session_factory
+        self.workers = max(1, workers)
+        self.spool_dir = spool_dir
+        # Latest state of jobs this process touched, so progress polling rarely reaches SQLite.
+        self.states = LRUCache(max_items=1000, ttl=60 * 60)
+        self._queue = queue.Queue()
+        self._threads = []
+        self._active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        return self._queue.qsize() + self._active
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            os.makedirs(self.spool_dir, exist_ok=True)
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"analysis-job-{number}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def resume(self):
+        self.start()
+        now = time.time()
+        db = self.session_factory()
+        try:
+            db.query(AnalysisJob).filter(
+                AnalysisJob.status.in_(("done", "failed")), AnalysisJob.updated_at < now - JOB_RETENTION_SECONDS
+            ).delete(synchronize_session=False)
+            db.commit()
+            resumable = (
+                db.query(AnalysisJob.id)
+                .filter(
+                    (AnalysisJob.status == "queued")
+                    | ((AnalysisJob.status == "running") & (AnalysisJob.updated_at < now - JOB_LEASE_SECONDS))
+                )
+                .order_by(AnalysisJob.created_at)
+                .all()
+            )
+        finally:
+            db.close()
+        for (job_id,) in resumable:
+            self._queue.put(job_id)
+        return len(resumable)
+
+    def stop(self):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout=5)
+
+    def submit(self, db, user_id, filename, file_obj, job_description, idempotency_key=None):
+        # A retried submit with the same idempotency key gets the job the first one created.
+        existing = self.find(db, user_id, idempotency_key)
+        if existing is not None:
+            return existing
+        if self.pending >= JOB_MAX_PENDING:
+            raise QueueFull()
+        self.start()
+        job_id = secrets.token_urlsafe(16)
+        spool_path = os.path.join(self.spool_dir, job_id)
+        with open(spool_path, "wb") as spool:
+            shutil.copyfileobj(file_obj, spool)
+        now = time.time()
+        db.add(
+            AnalysisJob(
+                id=job_id,
+                user_id=user_id,
+                status="queued",
+                stage="queued",
+                filename=filename,
+                spool_path=spool_path,
+                job_description=job_description,
+                created_at=now,
+                updated_at=now,
+                idempotency_key=idempotency_key,
+            )
+        )
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent submit with the same key committed first.
+            db.rollback()
+            os.remove(spool_path)
+            existing = self.find(db, user_id, idempotency_key)
+            if existing is None:
+                raise
+            return existing
+        self.states.set(job_id, {"id": job_id, "user_id": user_id, "status": "queued", "stage": "queued", "error": None})
+        self._queue.put(job_id)
+        return job_id
+
+    def find(self, db, user_id, idempotency_key):
+        if not idempotency_key:
+            return None
+        row = (
+            db.query(AnalysisJob.id)
+            .filter(AnalysisJob.user_id == user_id, AnalysisJob.idempotency_key == idempotency_key)
+            .first()
+        )
+        return row[0] if row is not None else None
+
+    def state(self, job_id):
+        state = self.states.get(job_id)
+        if state is not None:
+            return state
+        db = self.session_factory()
+        try:
+            job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+        finally:
+            db.close()
+        if job is None:
+            return None
+        state = {"id": job.id, "user_id": job.user_id, "status": job.status, "stage": job.stage, "error": job.error}
+        if job.status in ("done", "failed"):
+            self.states.set(job_id, state)
+        return state
+
+    def result(self, job_id):
+        db = self.session_factory()
+        try:
+            job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+            return json.loads(job.result) if job is not None and job.result else None
+        finally:
+            db.close()
+
+    def _update(self, db, job_id, **values):
+        values["updated_at"] = time.time()
+        db.query(AnalysisJob).filter(AnalysisJob.id == job_id).update(values, synchronize_session=False)
+        db.commit()
+        state = self.states.get(job_id) or {"id": job_id, "error": None}
+        state = dict(state, **{key: values[key] for key in ("status", "stage", "error") if key in values})
+        self.states.set(job_id, state)
+
+    def _claim(self, db, job_id):
+        now = time.time()
+        claimed = (
+            db.query(AnalysisJob)
+            .filter(
+                AnalysisJob.id == job_id,
+                (AnalysisJob.status == "queued")
+                | ((AnalysisJob.status == "running") & (AnalysisJob.updated_at < now - JOB_LEASE_SECONDS)),
+            )
+            .update({"status": "running", "updated_at": now}, synchronize_session=False)
+        )
+        db.commit()
+        if not claimed:
+            return None
+        return db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+
+    def _run(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            with self._lock:
+                self._active += 1
+            try:
+                self._process(job_id)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+    def _process(self, job_id):
+        db = self.session_factory()
+        try:
+            job = self._claim(db, job_id)
+            if job is None:
+                return
+            self.states.set(job_id, {"id": job_id, "user_id": job.user_id, "status": "running", "stage": job.stage, "error": None})
+
+            def set_stage(stage):
+                self._update(db, job_id, stage=stage)
+
+            try:
+                result = self.handler(job, set_stage)
+            except JobFailed as e:
+                self._update(db, job_id, status="failed", error=str(e))
+            except Exception:
+                logger.exception("Analysis job %s failed", job_id)
+                self._update(db, job_id, status="failed", error="Analysis failed. Please try again.")
+            else:
+                self._update(db, job_id, status="done", stage="done", result=json.dumps(result))
+            if job.spool_path and os.path.exists(job.spool_path):
+                os.remove(job.spool_path)
+        except Exception:
+            logger.exception("Could not process analysis job %s", job_id)
+        finally:
+            db.close()
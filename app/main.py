@@ -1,32 +1,102 @@
 from app.utils import (
     generate_career_suggestions,
-    extract_text_from_upload,
-    clean_text,
-    calculate_similarity,
+    score_resume,
+    score_resume_text,
+    extract_text_cached,
+    expand_screening_upload,
+    check_screening_upload_size,
+    screen_resume,
+    score_screening_terms,
+    MAX_SCREENING_FILES,
     generate_action_plan,
     build_report_text,
-    analyze_resume_quality,
     build_ats_resume_text,
     build_ats_resume_pdf_bytes,
     build_ats_resume_docx_bytes,
     build_cover_letter_text,
     build_cover_letter_pdf_bytes,
     build_cover_letter_docx_bytes,
+    extraction_flight,
+    jd_flight,
 )
-from app.skill_db import skills
+from app.skill_taxonomy import get_taxonomy
+from app.text_cache import text_cache
+from app.skill_index import skill_index, parse_skill_query
+from app.session_store import ServerSessionMiddleware, rotate_session
+from app.identity_cache import identity_cache
+from app.render_cache import render_cache, etag_matches
+from app.result_cache import result_cache, saved_results, clean_idempotency_key
+from app.singleflight import AsyncSingleFlight
+from app.exports import EXPORT_DATASETS, EXPORT_MEDIA_TYPES, export_stream
+from app.write_behind import write_behind, insert_row, wait_for_user_writes
+from app.executor import analysis_executor, screening_executor, QueueFull, RETRY_AFTER_SECONDS
+from app.jobs import JobRunner, JobFailed, JOB_STAGES
+from app.metrics import MetricsMiddleware, METRICS_TOKEN, STAGE_SECONDS, UPLOAD_BYTES, registry
+from app.profiler import ProfilerMiddleware, PROFILING_ENABLED, profile_store, profile_sync_routes, request_token, token_matches
+from typing import List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import json
+import os
+import secrets
+import zipfile
 from fastapi import UploadFile, File, FastAPI, Request, Form, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse, PlainTextResponse, Response
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse, PlainTextResponse, Response, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from starlette.middleware.sessions import SessionMiddleware
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
-from app.auth_db import get_db, User, Analysis, Application, hash_password, verify_password
+from app.migrations import run_migrations
+from app.auth_db import get_db, SessionLocal, User, Analysis, AnalysisSkill, Application, ScreeningBatch, Skill, SKILL_MISSING, hash_password, verify_password
+
+class TimedTemplates(Jinja2Templates):
+    def TemplateResponse(self, name, *args, **kwargs):
+        # Jinja renders the page while the response is constructed, so this times the render itself.
+        with STAGE_SECONDS.time("template_render", name):
+            return super().TemplateResponse(name, *args, **kwargs)
 
-app = FastAPI()
-app.add_middleware(SessionMiddleware, secret_key="supersecretkey", max_age=60 * 60 * 24 * 90)
-templates = Jinja2Templates(directory="app/templates")
 
-ALL_SKILLS = skills["technical"] + skills["soft_skills"] + skills["tools"] + skills["business"]
+app = FastAPI()
+app.add_middleware(ServerSessionMiddleware, secret_key=os.getenv("SESSION_SECRET", "supersecretkey"), max_age=60 * 60 * 24 * 90)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+# Added last so it is outermost and its latency includes the session middleware.
+app.add_middleware(MetricsMiddleware)
+templates = TimedTemplates(directory="app/templates")
+
+# Load and compile the skill taxonomy at import so the first /analyze/ request does not pay for it.
+get_taxonomy()
 ROLE_LABELS = {"job_seeker": "Job Seeker", "hr": "HR"}
+HISTORY_PAGE_SIZE = 20
+CHART_MAX_POINTS = 60
+SKILL_GAP_LIMIT = 8
+SKILL_GAP_RECENT_DAYS = 30
+
+
+@app.on_event("startup")
+def apply_migrations():
+    # A no-op PRAGMA read on an up-to-date database; deployments run `python -m app.migrations` first.
+    run_migrations()
+
+
+@app.on_event("startup")
+def resume_analysis_jobs():
+    analysis_jobs.resume()
+
+
+@app.on_event("startup")
+def enable_route_profiling():
+    # Every route is registered by now; sync handlers run on threadpool threads the middleware cannot see.
+    if PROFILING_ENABLED:
+        profile_sync_routes(app)
+
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    analysis_jobs.stop()
+    analysis_executor.shutdown()
+    screening_executor.shutdown()
+    write_behind.stop()
 
 
 def normalize_linkedin_url(url: str):
@@ -52,15 +122,29 @@ def hr_restricted_redirect(request: Request):
     return None
 
 
+def hr_only_redirect(request: Request):
+    if get_session_role(request) != "hr":
+        return RedirectResponse("/dashboard", status_code=303)
+    return None
+
+
+def sync_session_identity(request: Request, user):
+    # Only write keys whose values changed so an unchanged session is not re-saved.
+    values = {"user": user.email, "user_id": user.id, "role": user.role or "job_seeker", "linkedin_url": user.linkedin_url}
+    for key, value in values.items():
+        if request.session.get(key) != value:
+            request.session[key] = value
+
+
 def get_current_user(request: Request, db: Session):
     user_id = request.session.get("user_id")
     if user_id:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = identity_cache.get(user_id)
+        if user is None:
+            record = db.query(User).filter(User.id == user_id).first()
+            user = identity_cache.put(record) if record else None
         if user:
-            request.session["user"] = user.email
-            request.session["user_id"] = user.id
-            request.session["role"] = user.role or "job_seeker"
-            request.session["linkedin_url"] = user.linkedin_url
+            sync_session_identity(request, user)
             return user
 
     email = request.session.get("user")
@@ -68,20 +152,19 @@ def get_current_user(request: Request, db: Session):
         return None
     role = request.session.get("role")
     if role:
-        user = db.query(User).filter(User.email == email, User.role == role).first()
+        user = identity_cache.get_by_email(email, role)
+        if user is None:
+            record = db.query(User).filter(User.email == email, User.role == role).first()
+            user = identity_cache.put(record) if record else None
         if user:
-            request.session["user_id"] = user.id
-            request.session["linkedin_url"] = user.linkedin_url
+            sync_session_identity(request, user)
             return user
 
     # Backward-compatible recovery for older sessions that did not store role/user_id.
-    candidates = db.query(User).filter(User.email == email).order_by(User.id.desc()).all()
+    candidates = db.query(User).filter(User.email == email).order_by(User.id.desc()).limit(2).all()
     if len(candidates) == 1:
-        user = candidates[0]
-        request.session["user"] = user.email
-        request.session["user_id"] = user.id
-        request.session["role"] = user.role or "job_seeker"
-        request.session["linkedin_url"] = user.linkedin_url
+        user = identity_cache.put(candidates[0])
+        sync_session_identity(request, user)
         return user
     return None
 
@@ -107,10 +190,8 @@ def handle_login(request: Request, account_role: str, email: str, password: str,
                 "account_label": ROLE_LABELS[account_role],
             },
         )
-    request.session["user"] = user.email
-    request.session["user_id"] = user.id
-    request.session["linkedin_url"] = user.linkedin_url
-    request.session["role"] = user.role or "job_seeker"
+    sync_session_identity(request, identity_cache.put(user))
+    rotate_session(request)
     return RedirectResponse("/upload", status_code=303)
 
 
@@ -181,6 +262,7 @@ def handle_register(
     new_user = User(email=email, hashed_password=hash_password(password), linkedin_url=normalized_linkedin, role=account_role)
     db.add(new_user)
     db.commit()
+    identity_cache.invalidate(email=email, role=account_role)
     return RedirectResponse(f"/login/{'job-seeker' if account_role == 'job_seeker' else 'hr'}", status_code=303)
 
 
@@ -233,59 +315,39 @@ def upload_page(request: Request, db: Session = Depends(get_db)):
         {"request": request, "linkedin_url": user.linkedin_url, "role": user.role or "job_seeker"},
     )
 
-@app.post("/analyze/", response_class=HTMLResponse)
-async def analyze_resume(request: Request, resume: UploadFile = File(...), job_description: str = Form(...), db: Session = Depends(get_db)):
-    if not request.session.get("user"):
-        return RedirectResponse("/login", status_code=303)
-    user = get_current_user(request, db)
-    if not user:
-        return RedirectResponse("/login", status_code=303)
-    user_email = user.email
-    try:
-        resume_text = extract_text_from_upload(resume)
-    except ValueError as e:
-        return templates.TemplateResponse(
-            "index.html",
-            {"request": request, "error": str(e), "linkedin_url": request.session.get("linkedin_url"), "role": get_session_role(request)},
-        )
-    except Exception:
-        return templates.TemplateResponse(
-            "index.html",
-            {
-                "request": request,
-                "error": "Could not read this document. Try another file format or a cleaner document.",
-                "linkedin_url": request.session.get("linkedin_url"),
-                "role": get_session_role(request),
-            },
-        )
-    if not resume_text:
-        return templates.TemplateResponse(
-            "index.html",
-            {"request": request, "error": "Could not read document content", "linkedin_url": request.session.get("linkedin_url"), "role": get_session_role(request)},
-        )
-    cleaned_resume = clean_text(resume_text)
-    cleaned_jd = clean_text(job_description)
-    similarity_score, matched_skills, missing_skills = calculate_similarity(cleaned_resume, cleaned_jd, ALL_SKILLS)
-    quality_audit = analyze_resume_quality(resume_text)
-    suggestions = generate_career_suggestions(similarity_score, missing_skills)
-    action_plan = generate_action_plan(similarity_score, matched_skills, missing_skills)
+def analysis_values(user_id: int, result: dict, taxonomy_version: str, idempotency_key: Optional[str] = None):
+    return {
+        "user_id": user_id,
+        "score": result["score"],
+        "matched_skills": ", ".join(result["matched"]),
+        "missing_skills": ", ".join(result["missing"]),
+        "created_at": datetime.utcnow().strftime("%Y-%m-%d"),
+        "taxonomy_version": taxonomy_version,
+        "idempotency_key": idempotency_key,
+    }
+
+
+def complete_analysis(result: dict):
+    # Suggestions and the action plan depend only on the scores, so they are cached with them.
+    result["suggestions"] = generate_career_suggestions(result["score"], result["missing"])
+    result["action_plan"] = generate_action_plan(result["score"], result["matched"], result["missing"])
+    return result
+
+
+def render_analysis_result(request: Request, user_email: str, result: dict):
+    similarity_score = result["score"]
+    matched_skills = result["matched"]
+    missing_skills = result["missing"]
+    if "action_plan" not in result:
+        result = complete_analysis(dict(result))
+    suggestions = result["suggestions"]
+    action_plan = result["action_plan"]
     report_text = build_report_text(user_email, similarity_score, matched_skills, missing_skills, action_plan)
     safe_email = user_email.replace("@", "_at_").replace(".", "_")
     request.session["latest_report"] = {
         "filename": f"{safe_email}_resume_report.txt",
         "text": report_text,
     }
-    if user:
-        from datetime import datetime
-        new_analysis = Analysis(
-            user_id=user.id,
-            score=similarity_score,
-            matched_skills=", ".join(matched_skills),
-            missing_skills=", ".join(missing_skills),
-            created_at=datetime.utcnow().strftime("%Y-%m-%d"),
-        )
-        db.add(new_analysis)
-        db.commit()
     return templates.TemplateResponse(
         "result.html",
         {
@@ -295,31 +357,504 @@ async def analyze_resume(request: Request, resume: UploadFile = File(...), job_d
             "missing": missing_skills,
             "suggestions": suggestions,
             "action_plan": action_plan,
-            "quality_audit": quality_audit,
+            "quality_audit": result["quality_audit"],
             "user": user_email,
             "linkedin_url": request.session.get("linkedin_url"),
             "role": get_session_role(request),
         },
     )
 
+
+def run_analysis_job(job, set_stage):
+    # Same pipeline as the synchronous /analyze/ path, with a stage recorded before each step.
+    taxonomy = get_taxonomy()
+    with open(job.spool_path, "rb") as spool:
+        data = spool.read()
+    cache_key = result_cache.key(job.filename, data, job.job_description, taxonomy.version)
+    result = result_cache.get(cache_key)
+    if result is None:
+        set_stage("extracting")
+        try:
+            resume_text = analysis_executor.call(extract_text_cached, job.filename, data)
+        except ValueError as e:
+            raise JobFailed(str(e))
+        except Exception:
+            raise JobFailed("Could not read this document. Try another file format or a cleaner document.")
+        if not resume_text:
+            raise JobFailed("Could not read document content")
+        set_stage("scoring")
+        result = complete_analysis(analysis_executor.call(score_resume_text, resume_text, job.job_description, taxonomy))
+        result_cache.set(cache_key, result)
+    set_stage("saving")
+    insert_analysis(analysis_values(job.user_id, result, taxonomy.version, job.idempotency_key), skip_duplicate=True)
+    return result
+
+
+analysis_jobs = JobRunner(run_analysis_job)
+# Identical uploads that arrive together, e.g. a double-click, share one extraction and scoring run.
+analysis_flight = AsyncSingleFlight()
+JOB_EVENTS_POLL_SECONDS = 0.25
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+
+
+def job_payload(state: dict):
+    job_id = state["id"]
+    return {
+        "id": job_id,
+        "status": state["status"],
+        "stage": state["stage"],
+        "error": state["error"],
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events",
+        "result_url": f"/jobs/{job_id}/result",
+    }
+
+
+def owned_job_state(request: Request, db: Session, job_id: str):
+    user = get_current_user(request, db)
+    state = analysis_jobs.state(job_id)
+    if not user or state is None or state["user_id"] != user.id:
+        return None, user
+    return state, user
+
+
+async def compute_analysis(filename: str, resume_bytes: bytes, job_description: str, taxonomy, cache_key: str):
+    async with analysis_executor.slot():
+        result = await analysis_executor.run(score_resume, filename, resume_bytes, job_description, taxonomy)
+    if result:
+        result = complete_analysis(result)
+        result_cache.set(cache_key, result)
+    return result
+
+
+def insert_analysis(values: dict, skip_duplicate: bool = False):
+    # Uses its own session: a coalesced save outlives the request whose get_db session started it.
+    db = SessionLocal()
+    try:
+        insert_row(db, Analysis, values, skip_duplicate=skip_duplicate)
+    finally:
+        db.close()
+
+
+async def save_analysis(user_id: int, result: dict, taxonomy_version: str, idempotency_key: Optional[str]):
+    # Returns the result to show: for a repeated idempotency key, the one saved the first time.
+    if idempotency_key:
+        saved = saved_results.get((user_id, idempotency_key))
+        if saved is not None:
+            return saved
+    values = analysis_values(user_id, result, taxonomy_version, idempotency_key)
+    await run_in_threadpool(insert_analysis, values, skip_duplicate=bool(idempotency_key))
+    if idempotency_key:
+        saved_results.set((user_id, idempotency_key), result)
+    return result
+
+
+@app.post("/analyze/", response_class=HTMLResponse)
+async def analyze_resume(
+    request: Request,
+    resume: UploadFile = File(...),
+    job_description: str = Form(...),
+    mode: str = Form("sync"),
+    idempotency_key: Optional[str] = Form(None),
+    db: Session = Depends(get_db),
+):
+    if not request.session.get("user"):
+        return RedirectResponse("/login", status_code=303)
+    user = await run_in_threadpool(get_current_user, request, db)
+    if not user:
+        return RedirectResponse("/login", status_code=303)
+    idempotency_key = clean_idempotency_key(idempotency_key or request.headers.get("idempotency-key"))
+    if mode == "job":
+        UPLOAD_BYTES.inc("analyze", amount=resume.size or 0)
+        # Only the spool copy happens in the request; extraction and scoring run on the job workers.
+        try:
+            job_id = await run_in_threadpool(
+                analysis_jobs.submit, db, user.id, resume.filename, resume.file, job_description, idempotency_key
+            )
+        except QueueFull:
+            return JSONResponse(
+                {"error": "The analyzer is busy right now. Please try again in a few seconds."},
+                status_code=503,
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        payload = job_payload(analysis_jobs.state(job_id))
+        return JSONResponse(payload, status_code=202, headers={"Location": payload["status_url"]})
+    user_email = user.email
+    if idempotency_key:
+        saved = saved_results.get((user.id, idempotency_key))
+        if saved is not None:
+            return render_analysis_result(request, user_email, saved)
+    resume_bytes = await resume.read()
+    UPLOAD_BYTES.inc("analyze", amount=len(resume_bytes))
+    taxonomy = get_taxonomy()
+    cache_key = await run_in_threadpool(result_cache.key, resume.filename, resume_bytes, job_description, taxonomy.version)
+    # A resubmitted resume + JD pair skips the worker pool and goes straight to saving and rendering.
+    result = result_cache.get(cache_key)
+    if result is None:
+        try:
+            result = await analysis_flight.do(
+                cache_key, compute_analysis, resume.filename, resume_bytes, job_description, taxonomy, cache_key
+            )
+        except QueueFull:
+            return templates.TemplateResponse(
+                "index.html",
+                {
+                    "request": request,
+                    "error": "The analyzer is busy right now. Please try again in a few seconds.",
+                    "linkedin_url": request.session.get("linkedin_url"),
+                    "role": get_session_role(request),
+                },
+                status_code=503,
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        except ValueError as e:
+            return templates.TemplateResponse(
+                "index.html",
+                {"request": request, "error": str(e), "linkedin_url": request.session.get("linkedin_url"), "role": get_session_role(request)},
+            )
+        except Exception:
+            return templates.TemplateResponse(
+                "index.html",
+                {
+                    "request": request,
+                    "error": "Could not read this document. Try another file format or a cleaner document.",
+                    "linkedin_url": request.session.get("linkedin_url"),
+                    "role": get_session_role(request),
+                },
+            )
+        if not result:
+            return templates.TemplateResponse(
+                "index.html",
+                {"request": request, "error": "Could not read document content", "linkedin_url": request.session.get("linkedin_url"), "role": get_session_role(request)},
+            )
+    if idempotency_key:
+        # Concurrent retries with one key wait for the first save instead of writing their own row.
+        result = await analysis_flight.do(
+            ("save", user.id, idempotency_key), save_analysis, user.id, result, taxonomy.version, idempotency_key
+        )
+    else:
+        await save_analysis(user.id, result, taxonomy.version, None)
+    return render_analysis_result(request, user_email, result)
+
+
+@app.get("/jobs/{job_id}")
+def analysis_job_status(request: Request, job_id: str, db: Session = Depends(get_db)):
+    if not request.session.get("user"):
+        return RedirectResponse("/login", status_code=303)
+    state, _ = owned_job_state(request, db, job_id)
+    if state is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+    return JSONResponse(job_payload(state))
+
+
+@app.get("/jobs/{job_id}/events")
+async def analysis_job_events(request: Request, job_id: str, db: Session = Depends(get_db)):
+    if not request.session.get("user"):
+        return RedirectResponse("/login", status_code=303)
+    state, _ = await run_in_threadpool(owned_job_state, request, db, job_id)
+    if state is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+
+    async def stream(state):
+        # Stages only move forward, so every stage up to the current one is reported even if
+        # several finished between two polls.
+        sent = -1
+        quiet_since = asyncio.get_running_loop().time()
+        while True:
+            current = JOB_STAGES.index(state["stage"]) if state["stage"] in JOB_STAGES else 0
+            for stage in JOB_STAGES[sent + 1 : current + 1]:
+                yield f"event: stage\ndata: {json.dumps({'stage': stage})}\n\n"
+                quiet_since = asyncio.get_running_loop().time()
+            sent = max(sent, current)
+            if state["status"] in ("done", "failed"):
+                yield f"event: {state['status']}\ndata: {json.dumps(job_payload(state))}\n\n"
+                return
+            if asyncio.get_running_loop().time() - quiet_since > JOB_EVENTS_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                quiet_since = asyncio.get_running_loop().time()
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+            state = await run_in_threadpool(analysis_jobs.state, job_id)
+
+    return StreamingResponse(
+        stream(state), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/jobs/{job_id}/result", response_class=HTMLResponse)
+def analysis_job_result(request: Request, job_id: str, db: Session = Depends(get_db)):
+    if not request.session.get("user"):
+        return RedirectResponse("/login", status_code=303)
+    state, user = owned_job_state(request, db, job_id)
+    if state is None:
+        return RedirectResponse("/upload", status_code=303)
+    if state["status"] == "failed":
+        return templates.TemplateResponse(
+            "index.html",
+            {"request": request, "error": state["error"], "linkedin_url": request.session.get("linkedin_url"), "role": get_session_role(request)},
+        )
+    result = analysis_jobs.result(job_id) if state["status"] == "done" else None
+    if result is None:
+        return JSONResponse(job_payload(state), status_code=202)
+    return render_analysis_result(request, user.email, result)
+
+def save_screening_batch(db: Session, user_id: int, job_description: str, ranked: list, taxonomy_version: str):
+    batch = ScreeningBatch(
+        user_id=user_id,
+        job_description=job_description,
+        candidate_count=len(ranked),
+        created_at=datetime.utcnow().strftime("%Y-%m-%d"),
+    )
+    db.add(batch)
+    db.flush()
+    db.add_all(
+        [
+            Analysis(
+                user_id=user_id,
+                batch_id=batch.id,
+                candidate_name=item["filename"],
+                score=item["score"],
+                matched_skills=", ".join(item["matched"]),
+                missing_skills=", ".join(item["missing"]),
+                created_at=batch.created_at,
+                taxonomy_version=taxonomy_version,
+            )
+            for item in ranked
+        ]
+    )
+    with STAGE_SECONDS.time("db_commit", ""):
+        db.commit()
+    db.refresh(batch)
+    return batch
+
+
+def screening_context(request: Request, user, db: Session, **extra):
+    batches = (
+        db.query(ScreeningBatch)
+        .filter(ScreeningBatch.user_id == user.id)
+        .order_by(ScreeningBatch.id.desc())
+        .limit(20)
+        .all()
+    )
+    context = {
+        "request": request,
+        "linkedin_url": user.linkedin_url,
+        "role": user.role or "job_seeker",
+        "batches": batches,
+        "results": None,
+        "failed": [],
+        "batch": None,
+        "search": None,
+    }
+    context.update(extra)
+    return context
+
+
+@app.get("/screening", response_class=HTMLResponse)
+def screening_page(request: Request, db: Session = Depends(get_db)):
+    if not request.session.get("user"):
+        return RedirectResponse("/login", status_code=303)
+    restricted = hr_only_redirect(request)
+    if restricted:
+        return restricted
+    user = get_current_user(request, db)
+    if not user:
+        return RedirectResponse("/login", status_code=303)
+    return templates.TemplateResponse("screening.html", screening_context(request, user, db))
+
+
+@app.post("/screening", response_class=HTMLResponse)
+async def screen_candidates(
+    request: Request,
+    resumes: List[UploadFile] = File(...),
+    job_description: str = Form(...),
+    db: Session = Depends(get_db),
+):
+    if not request.session.get("user"):
+        return RedirectResponse("/login", status_code=303)
+    restricted = hr_only_redirect(request)
+    if restricted:
+        return restricted
+    user = await run_in_threadpool(get_current_user, request, db)
+    if not user:
+        return RedirectResponse("/login", status_code=303)
+    files = []
+    try:
+        for upload in resumes:
+            check_screening_upload_size(upload.filename, upload.size or 0)
+            data = await upload.read()
+            UPLOAD_BYTES.inc("screening", amount=len(data))
+            # Decompressing an archive of up to MAX_SCREENING_BYTES must not stall the event loop.
+            files.extend(await run_in_threadpool(expand_screening_upload, upload.filename, data))
+    except (ValueError, zipfile.BadZipFile) as e:
+        error = str(e) if isinstance(e, ValueError) else "Could not open the ZIP archive."
+        context = await run_in_threadpool(screening_context, request, user, db, error=error)
+        return templates.TemplateResponse("screening.html", context)
+    if not files:
+        context = await run_in_threadpool(screening_context, request, user, db, error="No supported resume files were uploaded.")
+        return templates.TemplateResponse("screening.html", context)
+    if len(files) > MAX_SCREENING_FILES:
+        error = f"Screen at most {MAX_SCREENING_FILES} resumes per batch."
+        context = await run_in_threadpool(screening_context, request, user, db, error=error)
+        return templates.TemplateResponse("screening.html", context)
+
+    # Every worker scores against the same taxonomy version, even if a reload lands mid-batch.
+    taxonomy = get_taxonomy()
+    try:
+        async with screening_executor.slot():
+            results = await asyncio.gather(
+                *(screening_executor.run(screen_resume, name, data, job_description, taxonomy) for name, data in files)
+            )
+    except QueueFull:
+        context = await run_in_threadpool(
+            screening_context, request, user, db, error="Another screening is in progress. Please try again shortly."
+        )
+        return templates.TemplateResponse(
+            "screening.html", context, status_code=503, headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
+
+    if any("terms" in result for result in results):
+        results = await run_in_threadpool(score_screening_terms, results, job_description)
+    ranked = sorted((r for r in results if not r["error"]), key=lambda r: r["score"], reverse=True)
+    failed = [r for r in results if r["error"]]
+    batch = await run_in_threadpool(save_screening_batch, db, user.id, job_description, ranked, taxonomy.version)
+    context = await run_in_threadpool(screening_context, request, user, db, results=ranked, failed=failed, batch=batch)
+    return templates.TemplateResponse("screening.html", context)
+
+
+@app.get("/screening/{batch_id}", response_class=HTMLResponse)
+def screening_batch_page(request: Request, batch_id: int, db: Session = Depends(get_db)):
+    if not request.session.get("user"):
+        return RedirectResponse("/login", status_code=303)
+    restricted = hr_only_redirect(request)
+    if restricted:
+        return restricted
+    user = get_current_user(request, db)
+    if not user:
+        return RedirectResponse("/login", status_code=303)
+    batch = db.query(ScreeningBatch).filter(ScreeningBatch.id == batch_id, ScreeningBatch.user_id == user.id).first()
+    if not batch:
+        return RedirectResponse("/screening", status_code=303)
+    rows = db.query(Analysis).filter(Analysis.batch_id == batch.id).order_by(Analysis.score.desc(), Analysis.id).all()
+    results = [
+        {
+            "filename": row.candidate_name,
+            "score": row.score,
+            "matched": row.matched_skills.split(", ") if row.matched_skills else [],
+            "missing": row.missing_skills.split(", ") if row.missing_skills else [],
+        }
+        for row in rows
+    ]
+    return templates.TemplateResponse("screening.html", screening_context(request, user, db, results=results, batch=batch))
+
+
+@app.get("/candidates", response_class=HTMLResponse)
+def search_candidates(request: Request, have: str = "", lack: str = "", db: Session = Depends(get_db)):
+    if not request.session.get("user"):
+        return RedirectResponse("/login", status_code=303)
+    restricted = hr_only_redirect(request)
+    if restricted:
+        return restricted
+    user = get_current_user(request, db)
+    if not user:
+        return RedirectResponse("/login", status_code=303)
+    have_skills, lack_skills = parse_skill_query(have), parse_skill_query(lack)
+    total, ids = skill_index.search(have_skills, lack_skills, owner_id=user.id)
+    rows = {row.id: row for row in db.query(Analysis).filter(Analysis.id.in_(ids)).all()} if ids else {}
+    candidates = [
+        {
+            "filename": rows[analysis_id].candidate_name,
+            "batch_id": rows[analysis_id].batch_id,
+            "score": rows[analysis_id].score,
+            "matched": rows[analysis_id].matched_skills.split(", ") if rows[analysis_id].matched_skills else [],
+        }
+        for analysis_id in ids
+        if analysis_id in rows
+    ]
+    search = {"have": ", ".join(have_skills), "lack": ", ".join(lack_skills), "total": total, "candidates": candidates}
+    return templates.TemplateResponse("screening.html", screening_context(request, user, db, search=search))
+
+
+def load_score_history(db: Session, filters, total_scans: int):
+    # Downsample in SQL: number the rows, average them in equal buckets, and return at most CHART_MAX_POINTS.
+    bucket = max(1, -(-total_scans // CHART_MAX_POINTS))
+    numbered = (
+        db.query(
+            Analysis.score.label("score"),
+            Analysis.created_at.label("created_at"),
+            (func.row_number().over(order_by=Analysis.id) - 1).label("position"),
+        )
+        .filter(*filters)
+        .subquery()
+    )
+    bucket_key = numbered.c.position - numbered.c.position % bucket
+    rows = (
+        db.query(func.min(numbered.c.position), func.max(numbered.c.created_at), func.avg(numbered.c.score))
+        .group_by(bucket_key)
+        .order_by(bucket_key)
+        .all()
+    )
+    return [{"label": created_at or f"#{position + 1}", "score": round(score or 0)} for position, created_at, score in rows]
+
+
+def load_skill_gaps(db: Session, user_id: int):
+    # Aggregated inside the (user_id, status, skill_id, created_at) index; only the top rows are joined to names.
+    since = (datetime.utcnow() - timedelta(days=SKILL_GAP_RECENT_DAYS)).strftime("%Y-%m-%d")
+    counts = (
+        db.query(
+            AnalysisSkill.skill_id.label("skill_id"),
+            func.count().label("total"),
+            func.sum(case((AnalysisSkill.created_at >= since, 1), else_=0)).label("recent"),
+        )
+        .filter(AnalysisSkill.user_id == user_id, AnalysisSkill.status == SKILL_MISSING)
+        .group_by(AnalysisSkill.skill_id)
+        .order_by(func.count().desc())
+        .limit(SKILL_GAP_LIMIT)
+        .subquery()
+    )
+    rows = (
+        db.query(Skill.name, counts.c.total, counts.c.recent)
+        .join(counts, Skill.id == counts.c.skill_id)
+        .order_by(counts.c.total.desc(), Skill.name)
+        .all()
+    )
+    return [{"skill": name, "total": total, "recent": recent or 0} for name, total, recent in rows]
+
+
 @app.get("/dashboard", response_class=HTMLResponse)
-def dashboard(request: Request, db: Session = Depends(get_db)):
+def dashboard(request: Request, before: Optional[int] = None, db: Session = Depends(get_db)):
     if not request.session.get("user"):
         return RedirectResponse("/login", status_code=303)
     user = get_current_user(request, db)
     if not user:
         return RedirectResponse("/login", status_code=303)
     user_email = user.email
-    request.session["user_id"] = user.id
-    request.session["role"] = user.role or "job_seeker"
-    analyses = db.query(Analysis).filter(Analysis.user_id == user.id).all()
-    total_scans = len(analyses)
-    avg_score = int(sum(a.score or 0 for a in analyses) / total_scans) if total_scans > 0 else 0
-    ordered = sorted(analyses, key=lambda a: a.id)
-    last_score = int(ordered[-1].score or 0) if ordered else 0
-    prev_score = int(ordered[-2].score or 0) if len(ordered) > 1 else last_score
-    score_change = last_score - prev_score if len(ordered) > 1 else 0
-    score_history = [{"label": a.created_at or f"#{i+1}", "score": round(a.score or 0)} for i, a in enumerate(ordered)]
+    wait_for_user_writes(user.id)
+    filters = (Analysis.user_id == user.id, Analysis.batch_id.is_(None))
+    total_scans, avg_score, high_count = (
+        db.query(
+            func.count(Analysis.id),
+            func.avg(Analysis.score),
+            func.sum(case((Analysis.score >= 60, 1), else_=0)),
+        )
+        .filter(*filters)
+        .one()
+    )
+    avg_score = int(avg_score or 0)
+    latest = db.query(Analysis.score).filter(*filters).order_by(Analysis.id.desc()).limit(2).all()
+    last_score = int(latest[0].score or 0) if latest else 0
+    prev_score = int(latest[1].score or 0) if len(latest) > 1 else last_score
+    score_change = last_score - prev_score if len(latest) > 1 else 0
+    score_history = load_score_history(db, filters, total_scans) if total_scans > 1 else []
+    skill_gaps = load_skill_gaps(db, user.id)
+
+    history_query = db.query(Analysis).filter(*filters)
+    if before:
+        history_query = history_query.filter(Analysis.id < before)
+    analyses = history_query.order_by(Analysis.id.desc()).limit(HISTORY_PAGE_SIZE + 1).all()
+    next_before = analyses[HISTORY_PAGE_SIZE - 1].id if len(analyses) > HISTORY_PAGE_SIZE else None
+    analyses = analyses[:HISTORY_PAGE_SIZE]
     return templates.TemplateResponse(
         "dashboard.html",
         {
@@ -327,9 +862,14 @@ def dashboard(request: Request, db: Session = Depends(get_db)):
             "analyses": analyses,
             "total_scans": total_scans,
             "avg_score": avg_score,
+            "high_count": high_count or 0,
             "last_score": last_score,
             "score_change": score_change,
             "score_history": score_history,
+            "skill_gaps": skill_gaps,
+            "skill_gap_days": SKILL_GAP_RECENT_DAYS,
+            "next_before": next_before,
+            "is_first_page": not before,
             "user": user_email,
             "linkedin_url": user.linkedin_url,
             "role": user.role or "job_seeker",
@@ -369,14 +909,119 @@ def update_profile(request: Request, linkedin_url: str = Form(""), db: Session =
                 "role": user.role or "job_seeker",
             },
         )
-    user.linkedin_url = normalized_linkedin
+    db.query(User).filter(User.id == user.id).update({User.linkedin_url: normalized_linkedin})
     db.commit()
-    request.session["linkedin_url"] = user.linkedin_url
+    identity_cache.invalidate(user_id=user.id)
+    request.session["linkedin_url"] = normalized_linkedin
     return templates.TemplateResponse(
         "profile.html",
-        {"request": request, "linkedin_url": user.linkedin_url, "saved": True, "role": user.role or "job_seeker"},
+        {"request": request, "linkedin_url": normalized_linkedin, "saved": True, "role": user.role or "job_seeker"},
+    )
+
+@app.get("/cache-stats")
+def cache_stats(request: Request):
+    if not request.session.get("user"):
+        return RedirectResponse("/login", status_code=303)
+    taxonomy = get_taxonomy()
+    return JSONResponse(
+        {
+            "extracted_text": text_cache.stats(),
+            "analysis_result": result_cache.stats(),
+            "skill_index": skill_index.stats(),
+            "single_flight": {
+                "analysis": analysis_flight.stats(),
+                "extraction": extraction_flight.stats(),
+                "job_description": jd_flight.stats(),
+            },
+            "taxonomy": {"version": taxonomy.version, "skills": len(taxonomy.skills), "aliases": len(taxonomy.aliases)},
+        }
     )
 
+
+def cache_counters(field):
+    caches = {
+        "extracted_text": text_cache.stats(),
+        "rendered_export": render_cache.stats(),
+        "identity": identity_cache.entries.stats(),
+        "analysis_result": result_cache.stats(),
+    }
+    return {(name,): stats[field] for name, stats in caches.items()}
+
+
+registry.callback("cache_hits_total", "Cache hits by cache.", ("cache",), lambda: cache_counters("hits"), kind="counter")
+registry.callback("cache_misses_total", "Cache misses by cache.", ("cache",), lambda: cache_counters("misses"), kind="counter")
+registry.callback(
+    "queue_depth",
+    "Work admitted or waiting per queue.",
+    ("queue",),
+    lambda: {
+        ("analysis_executor",): analysis_executor.in_flight,
+        ("screening_executor",): screening_executor.in_flight,
+        ("analysis_jobs",): analysis_jobs.pending,
+        ("write_behind",): write_behind.depth,
+    },
+)
+registry.callback(
+    "singleflight_coalesced_total",
+    "Calls that waited on an identical in-flight computation instead of running their own.",
+    ("flight",),
+    lambda: {
+        ("analysis",): analysis_flight.coalesced,
+        ("extraction",): extraction_flight.coalesced,
+        ("job_description",): jd_flight.coalesced,
+    },
+    kind="counter",
+)
+
+
+@app.get("/metrics")
+def metrics(request: Request):
+    # Scrapers cannot log in; set METRICS_TOKEN to require "Authorization: Bearer <token>" instead.
+    if METRICS_TOKEN and not secrets.compare_digest(request.headers.get("authorization", ""), f"Bearer {METRICS_TOKEN}"):
+        return PlainTextResponse("Forbidden", status_code=403)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def profiler_admin_token(request: Request):
+    token = request_token(request.headers.raw, request.scope.get("query_string", b""))
+    return token if token_matches(token) else None
+
+
+@app.get("/admin/profiles", response_class=HTMLResponse)
+def list_profiles(request: Request):
+    token = profiler_admin_token(request)
+    if not token:
+        return PlainTextResponse("Not Found", status_code=404)
+    return templates.TemplateResponse("profiles.html", {"request": request, "profiles": profile_store.recent(), "token": token})
+
+
+@app.get("/admin/profiles/{profile_id}")
+def show_profile(request: Request, profile_id: str):
+    if not profiler_admin_token(request):
+        return PlainTextResponse("Not Found", status_code=404)
+    profile = profile_store.load(profile_id)
+    if profile is None:
+        return PlainTextResponse("Not Found", status_code=404)
+    peak = f"{profile['peak_bytes'] / (1024 * 1024):.1f} MiB" if profile["peak_bytes"] is not None else "not traced"
+    report = (
+        f"{profile['method']} {profile['path']} -> {profile['status']} in {profile['duration_ms']} ms ({profile['trigger']})\n"
+        f"Peak traced memory: {peak}\n\n{profile['functions']}\n"
+    )
+    if profile["allocations"]:
+        report += f"Largest allocations at the end of the request:\n{profile['allocations']}\n"
+    return PlainTextResponse(report)
+
+
+@app.get("/admin/profiles/{profile_id}/raw")
+def download_profile(request: Request, profile_id: str):
+    if not profiler_admin_token(request):
+        return PlainTextResponse("Not Found", status_code=404)
+    path = profile_store.path(profile_id, ".prof")
+    if path is None or not os.path.exists(path):
+        return PlainTextResponse("Not Found", status_code=404)
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+
 @app.get("/logout")
 def logout(request: Request):
     request.session.clear()
@@ -395,6 +1040,29 @@ def download_report(request: Request):
     return response
 
 
+@app.get("/export/{dataset}.{export_format}")
+def export_history(request: Request, dataset: str, export_format: str, gzip: bool = False, db: Session = Depends(get_db)):
+    if not request.session.get("user"):
+        return RedirectResponse("/login", status_code=303)
+    if dataset not in EXPORT_DATASETS or export_format not in EXPORT_MEDIA_TYPES:
+        return PlainTextResponse("Not Found", status_code=404)
+    if dataset == "applications":
+        restricted = hr_restricted_redirect(request)
+        if restricted:
+            return restricted
+    user = get_current_user(request, db)
+    if not user:
+        return RedirectResponse("/login", status_code=303)
+    wait_for_user_writes(user.id)
+    filename = f"{dataset}-{datetime.utcnow():%Y-%m-%d}.{export_format}{'.gz' if gzip else ''}"
+    # Rows are fetched and encoded batch by batch while the response is sent.
+    return StreamingResponse(
+        export_stream(dataset, export_format, user.id, gzip=gzip),
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @app.get("/ats-resume", response_class=HTMLResponse)
 def ats_resume_page(request: Request):
     if not request.session.get("user"):
@@ -468,6 +1136,30 @@ def generate_ats_resume(
     )
 
 
+EXPORT_FORMATS = {
+    "pdf": ("application/pdf", "PDF export dependency missing. Install requirements and retry."),
+    "docx": (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "DOCX export dependency missing. Install requirements and retry.",
+    ),
+}
+
+
+def export_response(request: Request, renderer, text: str, export_format: str, filename: str):
+    media_type, missing_dependency_message = EXPORT_FORMATS[export_format]
+    # no-cache makes browsers revalidate with If-None-Match; the ETag comes from the inputs, so no render is needed.
+    etag = render_cache.etag(renderer.__name__, text)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    try:
+        body, _ = render_cache.render(renderer.__name__, text, renderer)
+    except ImportError:
+        return PlainTextResponse(missing_dependency_message, status_code=500)
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
 @app.get("/download-ats-resume")
 def download_ats_resume(request: Request):
     if not request.session.get("user"):
@@ -487,13 +1179,13 @@ def download_ats_resume_pdf(request: Request):
     ats_resume = request.session.get("ats_resume")
     if not ats_resume:
         return RedirectResponse("/ats-resume", status_code=303)
-    try:
-        pdf_bytes = build_ats_resume_pdf_bytes(ats_resume.get("text", ""))
-    except ImportError:
-        return PlainTextResponse("PDF export dependency missing. Install requirements and retry.", status_code=500)
-    response = Response(content=pdf_bytes, media_type="application/pdf")
-    response.headers["Content-Disposition"] = f'attachment; filename="{ats_resume.get("base_filename", "ats_resume")}.pdf"'
-    return response
+    return export_response(
+        request,
+        build_ats_resume_pdf_bytes,
+        ats_resume.get("text", ""),
+        "pdf",
+        f'{ats_resume.get("base_filename", "ats_resume")}.pdf',
+    )
 
 
 @app.get("/download-ats-resume-docx")
@@ -503,16 +1195,13 @@ def download_ats_resume_docx(request: Request):
     ats_resume = request.session.get("ats_resume")
     if not ats_resume:
         return RedirectResponse("/ats-resume", status_code=303)
-    try:
-        docx_bytes = build_ats_resume_docx_bytes(ats_resume.get("text", ""))
-    except ImportError:
-        return PlainTextResponse("DOCX export dependency missing. Install requirements and retry.", status_code=500)
-    response = Response(
-        content=docx_bytes,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    return export_response(
+        request,
+        build_ats_resume_docx_bytes,
+        ats_resume.get("text", ""),
+        "docx",
+        f'{ats_resume.get("base_filename", "ats_resume")}.docx',
     )
-    response.headers["Content-Disposition"] = f'attachment; filename="{ats_resume.get("base_filename", "ats_resume")}.docx"'
-    return response
 
 
 @app.get("/cover-letter", response_class=HTMLResponse)
@@ -599,13 +1288,13 @@ def download_cover_letter_pdf(request: Request):
     letter = request.session.get("cover_letter")
     if not letter:
         return RedirectResponse("/cover-letter", status_code=303)
-    try:
-        pdf_bytes = build_cover_letter_pdf_bytes(letter.get("text", ""))
-    except ImportError:
-        return PlainTextResponse("PDF export dependency missing. Install requirements and retry.", status_code=500)
-    response = Response(content=pdf_bytes, media_type="application/pdf")
-    response.headers["Content-Disposition"] = f'attachment; filename="{letter.get("base_filename", "cover_letter")}.pdf"'
-    return response
+    return export_response(
+        request,
+        build_cover_letter_pdf_bytes,
+        letter.get("text", ""),
+        "pdf",
+        f'{letter.get("base_filename", "cover_letter")}.pdf',
+    )
 
 
 @app.get("/download-cover-letter-docx")
@@ -615,16 +1304,13 @@ def download_cover_letter_docx(request: Request):
     letter = request.session.get("cover_letter")
     if not letter:
         return RedirectResponse("/cover-letter", status_code=303)
-    try:
-        docx_bytes = build_cover_letter_docx_bytes(letter.get("text", ""))
-    except ImportError:
-        return PlainTextResponse("DOCX export dependency missing. Install requirements and retry.", status_code=500)
-    response = Response(
-        content=docx_bytes,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    return export_response(
+        request,
+        build_cover_letter_docx_bytes,
+        letter.get("text", ""),
+        "docx",
+        f'{letter.get("base_filename", "cover_letter")}.docx',
     )
-    response.headers["Content-Disposition"] = f'attachment; filename="{letter.get("base_filename", "cover_letter")}.docx"'
-    return response
 
 
 @app.get("/applications", response_class=HTMLResponse)
@@ -637,6 +1323,7 @@ def applications_page(request: Request, db: Session = Depends(get_db)):
     user = get_current_user(request, db)
     if not user:
         return RedirectResponse("/login", status_code=303)
+    wait_for_user_writes(user.id)
     applications = db.query(Application).filter(Application.user_id == user.id).order_by(Application.id.desc()).all()
     return templates.TemplateResponse(
         "applications.html",
@@ -664,18 +1351,17 @@ def create_application(
     user = get_current_user(request, db)
     if not user:
         return RedirectResponse("/login", status_code=303)
-    application = Application(
-        user_id=user.id,
-        company=company.strip(),
-        role=role.strip(),
-        status=(status or "Applied").strip(),
-        job_link=job_link.strip() or None,
-        notes=notes.strip() or None,
-        date_applied=date_applied.strip() or None,
-        interview_date=interview_date.strip() or None,
-    )
-    db.add(application)
-    db.commit()
+    application = {
+        "user_id": user.id,
+        "company": company.strip(),
+        "role": role.strip(),
+        "status": (status or "Applied").strip(),
+        "job_link": job_link.strip() or None,
+        "notes": notes.strip() or None,
+        "date_applied": date_applied.strip() or None,
+        "interview_date": interview_date.strip() or None,
+    }
+    insert_row(db, Application, application)
     return RedirectResponse("/applications", status_code=303)
 
 
@@ -686,6 +1372,8 @@ def delete_application(request: Request, app_id: int, db: Session = Depends(get_
     user = get_current_user(request, db)
     if not user:
         return RedirectResponse("/login", status_code=303)
+    # The application may still be queued by write-behind; it has to be in the table to be deleted.
+    wait_for_user_writes(user.id)
     application = db.query(Application).filter(Application.id == app_id, Application.user_id == user.id).first()
     if application:
         db.delete(application)
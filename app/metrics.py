@@ -0,0 +1,223 @@
+"""In-process metrics: counters, scrape-time gauges and fixed-bucket histograms exposed as Prometheus text.
+
+Recording is a dict lookup and a couple of additions under a lock, cheap
+enough to leave on for every request. Process-pool workers cannot write to
+the parent's registry, so ``BoundedExecutor`` runs their tasks through
+``run_captured``; the samples come back with the result and are merged into
+the registry by the parent.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_capture = threading.local()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _record(self, value, labels):
+        buffer = getattr(_capture, "samples", None)
+        if buffer is not None:
+            buffer.append((self.name, labels, value))
+        else:
+            self._apply(value, labels)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        self._record(amount, labels)
+
+    def _apply(self, amount, labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_label_text(self.labelnames, labels)} {_number(value)}" for labels, value in items]
+
+
+class CallbackMetric(Metric):
+    """Values read at scrape time from ``callback``, which returns {label values: value}.
+
+    Used for numbers another object already keeps, such as queue depths and
+    cache hit counters, so the hot path does not record them twice.
+    """
+
+    def __init__(self, name, help_text, labelnames=(), callback=None, kind="gauge"):
+        super().__init__(name, help_text, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def render(self):
+        items = sorted(self.callback().items())
+        return self.header() + [f"{self.name}{_label_text(self.labelnames, labels)} {_number(value)}" for labels, value in items]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        self._record(value, labels)
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(time.perf_counter() - started, labels)
+
+    def _apply(self, value, labels):
+        # Per-bucket (not cumulative) counts, with one overflow slot; render() accumulates them.
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            state[0][index] += 1
+            state[1] += 1
+            state[2] += value
+
+    def render(self):
+        with self._lock:
+            items = sorted((labels, ([*counts], count, total)) for labels, (counts, count, total) in self._values.items())
+        lines = self.header()
+        inf = 'le="+Inf"'
+        for labels, (counts, count, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _label_text(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, inf)} {count}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name, help_text, labelnames=(), callback=None, kind="gauge"):
+        return self._register(CallbackMetric(name, help_text, labelnames, callback, kind))
+
+    def merge(self, samples):
+        for name, labels, value in samples:
+            metric = self.metrics.get(name)
+            if metric is not None:
+                metric._apply(value, labels)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception:
+                # A failing gauge callback must not take the rest of the scrape down with it.
+                continue
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUESTS = registry.counter("http_requests_total", "HTTP requests by route template, method and status.", ("method", "route", "status"))
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and method.", ("method", "route")
+)
+STAGE_SECONDS = registry.histogram(
+    "analysis_stage_seconds",
+    "Time spent in each pipeline stage; format is the document format, export renderer or template where one applies.",
+    ("stage", "format"),
+)
+UPLOAD_BYTES = registry.counter("upload_bytes_total", "Bytes of uploaded resumes by endpoint.", ("endpoint",))
+PAGES_PARSED = registry.counter("pdf_pages_parsed_total", "PDF pages run through text extraction.")
+
+
+def run_captured(fn, args, kwargs):
+    """Run ``fn`` in a pool process and return (result, samples recorded while it ran)."""
+    _capture.samples = samples = []
+    try:
+        return fn(*args, **kwargs), samples
+    finally:
+        _capture.samples = None
+
+
+class MetricsMiddleware:
+    """Counts and times every HTTP request, labelled with the matched route's path template.
+
+    Using the template (``/jobs/{job_id}``) rather than the raw path keeps the
+    number of label values bounded; requests no route matched share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], path)
+            REQUESTS.inc(scope["method"], path, str(status))
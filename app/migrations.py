@@ -0,0 +1,178 @@
+"""Versioned schema migrations for the SQLite database.
+
+The applied version is stored in ``PRAGMA user_version``, so an up-to-date
+database costs a single PRAGMA read at startup. Run it as a pre-start step:
+
+    python -m app.migrations
+
+Each step must be safe on databases created by older releases, which may
+already contain some of its changes (they were patched by the old
+import-time ``ensure_schema``).
+"""
+import time
+
+from sqlalchemy import text
+
+from app.auth_db import AnalysisJob, AnalysisSkill, Base, Skill, analysis_skill_rows, engine
+from app.skill_taxonomy import get_taxonomy
+
+BACKFILL_BATCH = 5000
+
+
+def table_columns(conn, table):
+    return {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})")).fetchall()}
+
+
+def add_column_if_missing(conn, table, column, ddl):
+    if column not in table_columns(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def migrate_baseline(conn):
+    Base.metadata.create_all(bind=conn)
+
+    users_cols = table_columns(conn, "users")
+    if "linkedin_url" not in users_cols:
+        conn.execute(text("ALTER TABLE users ADD COLUMN linkedin_url VARCHAR"))
+    if "role" not in users_cols:
+        conn.execute(text("ALTER TABLE users ADD COLUMN role VARCHAR DEFAULT 'job_seeker'"))
+        conn.execute(text("UPDATE users SET role = 'job_seeker' WHERE role IS NULL OR role = ''"))
+
+    has_old_unique_email = False
+    has_composite_unique = False
+    for idx in conn.execute(text("PRAGMA index_list(users)")).fetchall():
+        idx_name = idx[1]
+        is_unique = idx[2] == 1
+        if not is_unique:
+            continue
+        idx_cols = [row[2] for row in conn.execute(text(f"PRAGMA index_info('{idx_name}')")).fetchall()]
+        if idx_cols == ["email"]:
+            has_old_unique_email = True
+        if idx_cols == ["email", "role"]:
+            has_composite_unique = True
+    if has_old_unique_email or not has_composite_unique:
+        conn.execute(text("PRAGMA foreign_keys=OFF"))
+        conn.execute(
+            text(
+                """
+                CREATE TABLE users_new (
+                    id INTEGER PRIMARY KEY,
+                    email VARCHAR NOT NULL,
+                    hashed_password VARCHAR,
+                    linkedin_url VARCHAR,
+                    role VARCHAR NOT NULL DEFAULT 'job_seeker'
+                )
+                """
+            )
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO users_new (id, email, hashed_password, linkedin_url, role)
+                SELECT id, lower(trim(email)), hashed_password, linkedin_url, COALESCE(NULLIF(role, ''), 'job_seeker')
+                FROM users
+                """
+            )
+        )
+        conn.execute(text("CREATE UNIQUE INDEX uq_users_email_role ON users_new(email, role)"))
+        conn.execute(text("CREATE INDEX ix_users_email ON users_new(email)"))
+        conn.execute(text("DROP TABLE users"))
+        conn.execute(text("ALTER TABLE users_new RENAME TO users"))
+        conn.execute(text("PRAGMA foreign_keys=ON"))
+
+    add_column_if_missing(conn, "analysis", "created_at", "VARCHAR")
+    add_column_if_missing(conn, "applications", "date_applied", "VARCHAR")
+    add_column_if_missing(conn, "applications", "interview_date", "VARCHAR")
+
+
+def migrate_screening_batches(conn):
+    add_column_if_missing(conn, "analysis", "batch_id", "INTEGER REFERENCES screening_batches(id)")
+    add_column_if_missing(conn, "analysis", "candidate_name", "VARCHAR")
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_analysis_batch_id ON analysis(batch_id)"))
+
+
+def migrate_analysis_user_index(conn):
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_analysis_user_id_id ON analysis(user_id, id)"))
+
+
+def migrate_analysis_skills(conn):
+    Base.metadata.create_all(bind=conn, tables=[Skill.__table__, AnalysisSkill.__table__])
+    taxonomy = [{"name": name} for name in get_taxonomy().skills]
+    conn.execute(text("INSERT OR IGNORE INTO skills (name) VALUES (:name)"), taxonomy)
+    # Backfill from the comma-joined columns in keyset batches so large tables never load at once.
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            text(
+                "SELECT id, user_id, created_at, matched_skills, missing_skills FROM analysis "
+                "WHERE id > :last_id ORDER BY id LIMIT :batch"
+            ),
+            {"last_id": last_id, "batch": BACKFILL_BATCH},
+        ).fetchall()
+        if not rows:
+            break
+        values = []
+        for row in rows:
+            values.extend(analysis_skill_rows(conn, *row))
+        if values:
+            conn.execute(AnalysisSkill.__table__.insert().prefix_with("OR IGNORE"), values)
+        last_id = rows[-1][0]
+
+
+def migrate_taxonomy_version(conn):
+    add_column_if_missing(conn, "analysis", "taxonomy_version", "VARCHAR")
+
+
+def migrate_analysis_jobs(conn):
+    Base.metadata.create_all(bind=conn, tables=[AnalysisJob.__table__])
+
+
+def migrate_idempotency_keys(conn):
+    add_column_if_missing(conn, "analysis", "idempotency_key", "VARCHAR")
+    add_column_if_missing(conn, "analysis_jobs", "idempotency_key", "VARCHAR")
+    conn.execute(
+        text("CREATE UNIQUE INDEX IF NOT EXISTS uq_analysis_user_idempotency_key ON analysis(user_id, idempotency_key)")
+    )
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_analysis_jobs_user_idempotency_key "
+            "ON analysis_jobs(user_id, idempotency_key)"
+        )
+    )
+
+
+MIGRATIONS = [
+    (1, "baseline schema", migrate_baseline),
+    (2, "screening batches", migrate_screening_batches),
+    (3, "analysis (user_id, id) index", migrate_analysis_user_index),
+    (4, "normalized analysis skills", migrate_analysis_skills),
+    (5, "analysis taxonomy version", migrate_taxonomy_version),
+    (6, "analysis jobs", migrate_analysis_jobs),
+    (7, "analysis idempotency keys", migrate_idempotency_keys),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute(text("PRAGMA user_version")).scalar() or 0
+
+
+def run_migrations(bind=engine):
+    with bind.connect() as conn:
+        current = get_schema_version(conn)
+        if current >= LATEST_VERSION:
+            return current
+        for version, _, step in MIGRATIONS:
+            if version <= current:
+                continue
+            step(conn)
+            conn.execute(text(f"PRAGMA user_version = {version}"))
+            conn.commit()
+            current = version
+        return current
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    version = run_migrations()
+    print(f"Database schema at version {version} ({(time.perf_counter() - started) * 1000:.1f} ms)")
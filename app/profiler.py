@@ -0,0 +1,296 @@
+"""Opt-in request profiler: cProfile plus tracemalloc, saved per request for later inspection.
+
+A request is profiled when it carries the admin token (``X-Profile-Token``
+header or ``profile_token`` query parameter), or when sampling picks it: one
+in ``PROFILE_SAMPLE_EVERY`` requests runs under cProfile and is kept only if
+it took at least ``PROFILE_SLOW_MS``. Sampled requests skip tracemalloc,
+which slows allocation-heavy code several times over.
+
+cProfile only sees the thread it was enabled in, so the event-loop thread is
+profiled by the middleware, while sync route handlers and thread-pool tasks
+are profiled on their own threads through ``profiled_call`` and merged into
+the same report. Work sent to a process pool shows up as the time spent
+waiting for it. Only one request is profiled at a time; the event-loop
+profile can include other requests' coroutines that ran meanwhile.
+
+On Python 3.12+ cProfile is built on ``sys.monitoring``, which allows one
+active profiler per interpreter. If ``enable()`` refuses because another one
+is running (a debugger, or a second thread of the same request), that part of
+the request simply runs unprofiled.
+"""
+import asyncio
+import contextvars
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import secrets
+import threading
+import time
+import tracemalloc
+from functools import partial
+from urllib.parse import parse_qsl
+
+from starlette.concurrency import run_in_threadpool
+
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "1000"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+PROFILING_ENABLED = bool(PROFILER_TOKEN) or PROFILE_SAMPLE_EVERY > 0
+PROFILE_TOP_FUNCTIONS = 40
+PROFILE_TOP_ALLOCATIONS = 25
+TOKEN_HEADER = "x-profile-token"
+TOKEN_PARAM = "profile_token"
+# The profile pages themselves and scrapes are never profiled.
+UNPROFILED_PREFIXES = ("/admin/profiles", "/metrics")
+PROFILE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+logger = logging.getLogger(__name__)
+current_profile = contextvars.ContextVar("current_profile", default=None)
+
+
+def token_matches(value):
+    return bool(PROFILER_TOKEN) and bool(value) and secrets.compare_digest(value, PROFILER_TOKEN)
+
+
+def request_token(headers, query_string):
+    for name, value in headers:
+        if name == TOKEN_HEADER.encode("latin-1"):
+            return value.decode("latin-1")
+    return dict(parse_qsl(query_string.decode("latin-1"))).get(TOKEN_PARAM, "")
+
+
+def new_profile_id():
+    # Always generated here: a client-supplied ID could be reused to overwrite an earlier profile.
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(8)}"
+
+
+def request_id(headers):
+    # The caller's request ID is only recorded in the metadata, so the profile can be matched to logs.
+    for name, value in headers:
+        if name == b"x-request-id":
+            value = value.decode("latin-1")
+            return value if PROFILE_ID.match(value) else None
+    return None
+
+
+class RequestProfile:
+    """Profiles collected from every thread that worked on one request."""
+
+    def __init__(self):
+        self.stats = None
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        profile.create_stats()
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+
+    def run(self, fn, *args, **kwargs):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            self.add(profile)
+
+
+def profiled_call(fn, *args, **kwargs):
+    profile = current_profile.get()
+    if profile is None:
+        return fn(*args, **kwargs)
+    return profile.run(fn, *args, **kwargs)
+
+
+def bind_profile(fn):
+    # run_in_executor does not carry context variables over, so bind the request's profile here.
+    profile = current_profile.get()
+    return fn if profile is None else partial(profile.run, fn)
+
+
+def _profiled_endpoint(endpoint):
+    def call(**values):
+        return profiled_call(endpoint, **values)
+
+    return call
+
+
+def profile_sync_routes(app):
+    """Wrap sync route handlers so the threadpool thread running them is profiled too."""
+    for route in app.routes:
+        dependant = getattr(route, "dependant", None)
+        if dependant is None or asyncio.iscoroutinefunction(dependant.call):
+            continue
+        dependant.call = _profiled_endpoint(dependant.call)
+
+
+class ProfileStore:
+    def __init__(self, directory=PROFILE_DIR, keep=PROFILE_KEEP):
+        self.directory = directory
+        self.keep = keep
+
+    def path(self, profile_id, suffix):
+        if not PROFILE_ID.match(profile_id):
+            return None
+        return os.path.join(self.directory, profile_id + suffix)
+
+    def save(self, profile_id, meta, stats):
+        os.makedirs(self.directory, exist_ok=True)
+        if stats is not None:
+            stats.dump_stats(self.path(profile_id, ".prof"))
+        with open(self.path(profile_id, ".json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        self.prune()
+
+    def prune(self):
+        for meta in self.recent(limit=None)[self.keep :]:
+            for suffix in (".json", ".prof"):
+                try:
+                    os.remove(self.path(meta["id"], suffix))
+                except OSError:
+                    pass
+
+    def recent(self, limit=100):
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(".json")]
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        entries.sort(key=lambda meta: meta["created_at"], reverse=True)
+        return entries if limit is None else entries[:limit]
+
+    def load(self, profile_id):
+        path = self.path(profile_id, ".json")
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def stats_report(stats):
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+    return out.getvalue()
+
+
+def allocation_report(snapshot):
+    lines = []
+    for stat in snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+    return "\n".join(lines)
+
+
+class ProfilerMiddleware:
+    def __init__(self, app, store=None, sample_every=PROFILE_SAMPLE_EVERY, slow_ms=PROFILE_SLOW_MS):
+        self.app = app
+        self.store = store or profile_store
+        self.sample_every = sample_every
+        self.slow_ms = slow_ms
+        self._requests = 0
+        self._busy = threading.Lock()
+
+    def _requested(self, scope):
+        return bool(PROFILER_TOKEN) and token_matches(request_token(scope["headers"], scope.get("query_string", b"")))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(UNPROFILED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        requested = self._requested(scope)
+        sampled = False
+        if not requested and self.sample_every > 0:
+            self._requests += 1
+            sampled = self._requests % self.sample_every == 0
+        if not (requested or sampled) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send, trace_memory=requested)
+        finally:
+            self._busy.release()
+
+    async def _profile(self, scope, receive, send, trace_memory):
+        loop_profile = cProfile.Profile()
+        try:
+            loop_profile.enable()
+        except ValueError:
+            logger.warning("Another profiler is active; %s runs unprofiled", scope["path"])
+            await self.app(scope, receive, send)
+            return
+        profile_id = new_profile_id()
+        request_profile = RequestProfile()
+        status = 500
+        tracing_before = tracemalloc.is_tracing()
+        if trace_memory:
+            if not tracing_before:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trace_memory:
+                    # Requested profiles are always kept, so the caller can be told where to look.
+                    message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode("latin-1"))]
+            await send(message)
+
+        token = current_profile.set(request_profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            loop_profile.disable()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            current_profile.reset(token)
+            request_profile.add(loop_profile)
+            peak_bytes, allocations = None, ""
+            if trace_memory:
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+                allocations = allocation_report(tracemalloc.take_snapshot())
+                if not tracing_before:
+                    tracemalloc.stop()
+            if trace_memory or elapsed_ms >= self.slow_ms:
+                meta = {
+                    "id": profile_id,
+                    "request_id": request_id(scope["headers"]),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round(elapsed_ms, 1),
+                    "peak_bytes": peak_bytes,
+                    "trigger": "requested" if trace_memory else "sampled",
+                    "created_at": time.time(),
+                    "allocations": allocations,
+                }
+                try:
+                    await run_in_threadpool(self._save, profile_id, meta, request_profile.stats)
+                except OSError:
+                    logger.exception("Could not save profile %s", profile_id)
+
+    def _save(self, profile_id, meta, stats):
+        meta["functions"] = stats_report(stats)
+        self.store.save(profile_id, meta, stats)
+
+
+profile_store = ProfileStore()
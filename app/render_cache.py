@@ -0,0 +1,74 @@
+import hashlib
+import logging
+import os
+
+from app.cache import LRUCache
+from app.metrics import STAGE_SECONDS
+from app.singleflight import SingleFlight
+
+# Bump whenever a build_*_bytes renderer changes its output so stale documents are not served.
+RENDERER_VERSION = "1"
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCache:
+    """Rendered PDF/DOCX exports keyed by document kind, renderer version and text.
+
+    The strong ETag is derived from that same key rather than from the bytes:
+    reportlab embeds timestamps and IDs, so a re-render after eviction would
+    otherwise change the ETag of an unchanged document. It can therefore be
+    checked before anything is rendered. Concurrent requests for the same
+    document wait on one render instead of each building it.
+    """
+
+    def __init__(self, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.entries = LRUCache(max_bytes=max_bytes, sizeof=len)
+        self.renders = 0
+        self.oversize = 0
+        self._flight = SingleFlight()
+
+    @staticmethod
+    def key(kind, text):
+        return hashlib.sha256(f"{kind}:{RENDERER_VERSION}:{text}".encode("utf-8")).hexdigest()
+
+    def etag(self, kind, text):
+        return f'"{self.key(kind, text)}"'
+
+    def render(self, kind, text, renderer):
+        """Return ``(body, etag)``, rendering at most once per key at a time."""
+        key = self.key(kind, text)
+        body = self.entries.get(key)
+        if body is None:
+            body = self._flight.do(key, self._render, key, kind, text, renderer)
+        return body, f'"{key}"'
+
+    def _render(self, key, kind, text, renderer):
+        with STAGE_SECONDS.time("export_render", kind):
+            body = renderer(text)
+        self.renders += 1
+        if len(body) > self.entries.max_bytes:
+            # Never cached, so every download of this document renders it again.
+            self.oversize += 1
+            logger.warning("%s export of %d bytes exceeds RENDER_CACHE_MAX_BYTES and is not cached", kind, len(body))
+        else:
+            self.entries.set(key, body)
+        return body
+
+    def stats(self):
+        stats = self.entries.stats()
+        stats["renders"] = self.renders
+        stats["oversize"] = self.oversize
+        return stats
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so a W/ prefix still matches.
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+render_cache = RenderCache()
@@ -0,0 +1,56 @@
+import hashlib
+import os
+
+from app.cache import LRUCache
+from app.extractors import EXTRACTOR_VERSION, detect_format_name
+from app.vector_scorer import SCORER_VERSION
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "2000"))
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(60 * 60)))
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", str(60 * 60 * 24)))
+MAX_IDEMPOTENCY_KEY_LENGTH = 128
+
+
+def normalize_job_description(job_description):
+    # Matching and scoring only see lowercased tokens, so case and spacing never change a result.
+    return " ".join((job_description or "").lower().split())
+
+
+def clean_idempotency_key(raw):
+    key = (raw or "").strip()
+    return key if 0 < len(key) <= MAX_IDEMPOTENCY_KEY_LENGTH else None
+
+
+class ResultCache:
+    """Finished /analyze/ results keyed by everything that determines them.
+
+    The key covers the resume bytes and detected format, the normalized job
+    description, the taxonomy version and the extractor and scorer versions,
+    so a reloaded taxonomy or a new scorer never serves a stale result.
+    Entries hold only user-independent values; the report text is still
+    built per user.
+    """
+
+    def __init__(self, max_items=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL):
+        self.entries = LRUCache(max_items=max_items, ttl=ttl)
+
+    @staticmethod
+    def key(filename, resume_bytes, job_description, taxonomy_version):
+        resume_hash = hashlib.sha256(resume_bytes).hexdigest()
+        resume_format = detect_format_name(filename, resume_bytes)
+        jd_hash = hashlib.sha256(normalize_job_description(job_description).encode("utf-8")).hexdigest()
+        return f"{resume_hash}:{resume_format}:{jd_hash}:{taxonomy_version}:{EXTRACTOR_VERSION}:{SCORER_VERSION}"
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, result):
+        self.entries.set(key, result)
+
+    def stats(self):
+        return self.entries.stats()
+
+
+result_cache = ResultCache()
+# (user id, idempotency key) -> the result saved for the first request that sent the key.
+saved_results = LRUCache(max_items=RESULT_CACHE_SIZE, ttl=IDEMPOTENCY_TTL)
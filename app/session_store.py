@@ -0,0 +1,195 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from itsdangerous import BadSignature, TimestampSigner
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+from app.cache import LRUCache
+
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_DB = os.getenv("SESSION_DB", "./sessions.db")
+SESSION_MAX_ITEMS = int(os.getenv("SESSION_MAX_ITEMS", "10000"))
+# Re-issue the cookie and extend the stored TTL at most this often for an unchanged session.
+SESSION_TOUCH_INTERVAL = 60 * 60 * 24
+ROTATE_SCOPE_KEY = "session.rotate"
+
+
+def rotate_session(request):
+    """Give the session a fresh ID when this response is sent, e.g. after a login.
+
+    A session ID known before authentication (one an attacker planted, say)
+    then no longer leads to the authenticated session.
+    """
+    request.scope[ROTATE_SCOPE_KEY] = True
+
+
+class MemorySessionStore:
+    blocking = False
+
+    def __init__(self, ttl, max_items=SESSION_MAX_ITEMS):
+        self.sessions = LRUCache(max_items=max_items, ttl=ttl)
+
+    def load(self, session_id):
+        data = self.sessions.get(session_id)
+        # Hand out a copy so in-place edits by one request are not visible to others before save().
+        return dict(data) if data is not None else None
+
+    def save(self, session_id, data):
+        self.sessions.set(session_id, dict(data))
+
+    def delete(self, session_id):
+        self.sessions.pop(session_id)
+
+
+class SQLiteSessionStore:
+    """Session data in a SQLite table so every worker process sees the same sessions."""
+
+    blocking = True
+    PURGE_EVERY = 500
+
+    def __init__(self, ttl, path=SESSION_DB):
+        self.ttl = ttl
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id):
+        row = self._connect().execute(
+            "SELECT data FROM sessions WHERE id = ? AND expires_at > ?", (session_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, session_id, data):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(data), time.time() + self.ttl),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, session_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
+def create_session_store(max_age, backend=SESSION_BACKEND):
+    if backend == "sqlite":
+        return SQLiteSessionStore(ttl=max_age)
+    if backend == "memory":
+        return MemorySessionStore(ttl=max_age)
+    raise ValueError(f"Unknown session backend: {backend}")
+
+
+class ServerSessionMiddleware:
+    """Drop-in replacement for Starlette's SessionMiddleware that keeps data server-side.
+
+    The cookie only carries a signed session ID. Session data is loaded from the
+    store before the request and written back only when it actually changed.
+    The ID is replaced, and the old entry deleted, whenever ``identity_key``
+    changes or a handler calls ``rotate_session``.
+    """
+
+    def __init__(
+        self,
+        app,
+        secret_key,
+        store=None,
+        session_cookie="session",
+        max_age=14 * 24 * 60 * 60,
+        path="/",
+        same_site="lax",
+        https_only=False,
+        identity_key="user_id",
+    ):
+        self.app = app
+        self.signer = TimestampSigner(str(secret_key))
+        self.store = store or create_session_store(max_age)
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.path = path
+        self.identity_key = identity_key
+        self.security_flags = "httponly; samesite=" + same_site
+        if https_only:
+            self.security_flags += "; secure"
+
+    async def _call_store(self, method, *args):
+        if self.store.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    def _read_cookie(self, connection):
+        cookie = connection.cookies.get(self.session_cookie)
+        if not cookie:
+            return None, None
+        try:
+            session_id, signed_at = self.signer.unsign(cookie, max_age=self.max_age, return_timestamp=True)
+        except BadSignature:
+            return None, None
+        return session_id.decode("utf-8"), signed_at.timestamp()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        session_id, signed_at = self._read_cookie(HTTPConnection(scope))
+        data = None
+        if session_id:
+            data = await self._call_store(self.store.load, session_id)
+            if data is None:
+                session_id = None
+        scope["session"] = data or {}
+        initial_state = json.dumps(scope["session"], sort_keys=True)
+        initial_identity = scope["session"].get(self.identity_key)
+
+        async def send_wrapper(message):
+            nonlocal session_id
+            if message["type"] != "http.response.start":
+                await send(message)
+                return
+            session = scope["session"]
+            headers = MutableHeaders(scope=message)
+            if not session:
+                if session_id:
+                    await self._call_store(self.store.delete, session_id)
+                    headers.append("Set-Cookie", self._cookie("null", expires=True))
+                await send(message)
+                return
+            changed = json.dumps(session, sort_keys=True) != initial_state
+            stale = signed_at is not None and time.time() - signed_at > SESSION_TOUCH_INTERVAL
+            rotate = scope.get(ROTATE_SCOPE_KEY) or session.get(self.identity_key) != initial_identity
+            if session_id and rotate:
+                await self._call_store(self.store.delete, session_id)
+                session_id = None
+            if changed or stale or not session_id:
+                session_id = session_id or secrets.token_urlsafe(32)
+                await self._call_store(self.store.save, session_id, session)
+                headers.append("Set-Cookie", self._cookie(self.signer.sign(session_id).decode("utf-8")))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _cookie(self, value, expires=False):
+        expiry = "expires=Thu, 01 Jan 1970 00:00:00 GMT; " if expires else f"Max-Age={self.max_age}; "
+        return f"{self.session_cookie}={value}; path={self.path}; {expiry}{self.security_flags}"
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key onto one execution.
+
+    The first caller for a key runs ``fn``; callers that arrive while it is
+    running block until it finishes and get the same result or exception.
+    Nothing is kept afterwards, so pair it with a cache for later callers.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        return {"in_flight": len(self._calls), "coalesced": self.coalesced}
+
+
+class AsyncSingleFlight:
+    """Event-loop version of ``SingleFlight`` for coroutine functions.
+
+    The computation runs as its own task and callers await it through
+    ``asyncio.shield``, so a caller that disconnects does not cancel the work
+    the others are waiting on.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._tasks = {}
+
+    async def do(self, key, fn, *args, **kwargs):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Marks the exception as retrieved when every caller went away before it finished.
+            task.exception()
+
+    def stats(self):
+        return {"in_flight": len(self._tasks), "coalesced": self.coalesced}
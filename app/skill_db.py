@@ -1,27 +0,0 @@
-skills = {
-    "technical": [
-        "python", "java", "c++", "sql", "mysql", "postgresql",
-        "react", "node", "mongodb", "docker", "aws",
-        "flask", "fastapi", "rest api",
-        "machine learning", "data analysis",
-        "pandas", "numpy", "excel", "power bi"
-    ],
-
-    "soft_skills": [
-        "communication", "leadership",
-        "teamwork", "problem solving",
-        "critical thinking", "adaptability",
-        "time management"
-    ],
-
-    "tools": [
-        "git", "github", "jira", "figma",
-        "tableau", "linux", "kubernetes"
-    ],
-
-    "business": [
-        "project management", "agile",
-        "scrum", "stakeholder management",
-        "strategy", "marketing", "sales"
-    ]
-}
@@ -0,0 +1,136 @@
+"""In-memory skill bitmaps over stored analyses for boolean candidate search.
+
+Every skill in an append-only, versioned dictionary owns one bit column: a
+bytearray with bit ``n`` set when the ``n``-th indexed analysis matched that
+skill. Read across the columns, row ``n`` is that analysis's fixed-width skill
+bitset. A query such as "docker AND kubernetes AND NOT aws" turns each column
+into an int and combines them with ``&`` and ``& ~``, so it costs a handful of
+C-level passes over the corpus instead of splitting every stored row.
+"""
+import re
+import threading
+from array import array
+
+from app.auth_db import Analysis, SessionLocal
+from app.skill_taxonomy import get_taxonomy
+
+SKILL_INDEX_BATCH = 5000
+NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+def split_skills(value):
+    return [skill for skill in (value or "").split(", ") if skill]
+
+
+def parse_skill_query(raw, aliases=None):
+    # Terms go through the taxonomy's aliases, so "k8s" finds analyses that matched "kubernetes".
+    if aliases is None:
+        aliases = get_taxonomy().aliases
+    terms = [" ".join(skill.lower().split()) for skill in (raw or "").split(",") if skill.strip()]
+    return [aliases.get(term, term) for term in terms]
+
+
+class SkillIndex:
+    def __init__(self, session_factory=SessionLocal, seed_skills=()):
+        self.session_factory = session_factory
+        self.skill_ids = {}
+        self.version = 0
+        self.columns = []
+        self.row_ids = array("q")
+        self.owner_rows = {}
+        self.last_id = 0
+        self._owner_masks = {}
+        self._lock = threading.Lock()
+        for skill in seed_skills:
+            self._skill_id(skill)
+
+    def _skill_id(self, skill):
+        skill_id = self.skill_ids.get(skill)
+        if skill_id is None:
+            # Appending keeps existing bit columns valid; the version tells readers the dictionary grew.
+            skill_id = len(self.columns)
+            self.skill_ids[skill] = skill_id
+            self.columns.append(bytearray((len(self.row_ids) + 7) >> 3))
+            self.version += 1
+        return skill_id
+
+    def _add(self, analysis_id, user_id, matched_skills):
+        row = len(self.row_ids)
+        self.row_ids.append(analysis_id)
+        if row % 8 == 0:
+            for column in self.columns:
+                column.append(0)
+        for skill in matched_skills:
+            self.columns[self._skill_id(skill)][row >> 3] |= 1 << (row & 7)
+        self.owner_rows.setdefault(user_id, array("q")).append(row)
+        self._owner_masks.pop(user_id, None)
+        self.last_id = analysis_id
+
+    def refresh(self):
+        # Catch up on rows committed since the last call, from any process or the write-behind queue.
+        with self._lock:
+            db = self.session_factory()
+            try:
+                while True:
+                    rows = (
+                        db.query(Analysis.id, Analysis.user_id, Analysis.matched_skills)
+                        .filter(Analysis.id > self.last_id)
+                        .order_by(Analysis.id)
+                        .limit(SKILL_INDEX_BATCH)
+                        .all()
+                    )
+                    for analysis_id, user_id, matched in rows:
+                        self._add(analysis_id, user_id, split_skills(matched))
+                    if len(rows) < SKILL_INDEX_BATCH:
+                        return
+            finally:
+                db.close()
+
+    def _owner_mask(self, user_id):
+        mask = self._owner_masks.get(user_id)
+        if mask is None:
+            bits = bytearray((len(self.row_ids) + 7) >> 3)
+            for row in self.owner_rows.get(user_id, ()):
+                bits[row >> 3] |= 1 << (row & 7)
+            mask = int.from_bytes(bits, "little")
+            self._owner_masks[user_id] = mask
+        return mask
+
+    def search(self, have=(), lack=(), owner_id=None, limit=100):
+        """Return (total matches, newest matching analysis ids up to ``limit``)."""
+        self.refresh()
+        with self._lock:
+            rows = len(self.row_ids)
+            result = (1 << rows) - 1 if owner_id is None else self._owner_mask(owner_id)
+            for skill in have:
+                skill_id = self.skill_ids.get(skill)
+                result &= int.from_bytes(self.columns[skill_id], "little") if skill_id is not None else 0
+            for skill in lack:
+                skill_id = self.skill_ids.get(skill)
+                if skill_id is not None:
+                    result &= ~int.from_bytes(self.columns[skill_id], "little")
+            return bin(result).count("1"), self._newest_ids(result, limit)
+
+    def _newest_ids(self, bits, limit):
+        data = bits.to_bytes((len(self.row_ids) + 7) >> 3, "little")[::-1]
+        ids = []
+        for match in NONZERO_BYTE.finditer(data):
+            byte_index = len(data) - 1 - match.start()
+            value = data[match.start()]
+            for bit in range(7, -1, -1):
+                if value >> bit & 1:
+                    ids.append(self.row_ids[byte_index * 8 + bit])
+                    if len(ids) == limit:
+                        return ids
+        return ids
+
+    def stats(self):
+        return {
+            "rows": len(self.row_ids),
+            "skills": len(self.columns),
+            "dictionary_version": self.version,
+            "bytes": sum(len(column) for column in self.columns) + self.row_ids.itemsize * len(self.row_ids),
+        }
+
+
+skill_index = SkillIndex(seed_skills=get_taxonomy().skills)
@@ -0,0 +1,143 @@
+import os
+import re
+
+# Tokens are runs of letters/digits, optionally followed by "+" or "#" so that
+# skills such as "c++" and "c#" survive tokenization. Everything else is a
+# boundary, which is what keeps "java" from matching inside "javascript".
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+[+#]*")
+TOKEN_SUFFIX = re.compile(r"[+#]*$")
+# Up to this many phrases, scanning the text once per phrase beats tokenizing it. The default is the
+# crossover measured by ``python -m benchmarks.bench_skill_matcher`` on 1500-word resumes.
+SCAN_MAX_PHRASES = int(os.getenv("SKILL_SCAN_MAX_PHRASES", "160"))
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def phrase_pattern(tokens):
+    # Matches the phrase exactly where tokenize() would produce these tokens in a row.
+    parts = []
+    for token in tokens:
+        suffix = TOKEN_SUFFIX.search(token).group()
+        parts.append(re.escape(token) + ("(?![+#])" if suffix else "(?![a-z0-9+#])"))
+    # The start boundary is a lookbehind after the first literal, so the pattern can be matched where str.find lands.
+    first = re.escape(tokens[0])
+    parts[0] = f"{first}(?<![a-z0-9]{first})" + parts[0][len(first):]
+    return re.compile("[^a-z0-9]*".join(parts))
+
+
+class SkillMatcher:
+    """Multi-pattern skill matcher compiled once from a skill list.
+
+    Every skill is tokenized once: single-word skills go into a dict keyed by
+    the word, multi-word skills are bucketed by their first word. Matching
+    tokenizes the document once, intersects the distinct words with the skill
+    dict and only walks token positions that can start a multi-word skill, so
+    the cost is linear in the document size and does not grow with the number
+    of skills.
+
+    Tokenizing a document has a fixed cost that a small taxonomy never earns
+    back, so up to ``SCAN_MAX_PHRASES`` skills and aliases (the measured
+    crossover; the bundled taxonomy has about 40) are matched with a
+    ``str.find`` per phrase instead, confirmed by a boundary regex only where
+    the substring occurs. Both paths return the same hits; ``scans_text`` says
+    which one is used. At the bundled size the scan takes about 2x the old
+    bare substring loop, which is the price of the boundary check that keeps
+    "java" from matching "javascript"; the token path would take 3-4x there.
+    """
+
+    def __init__(self, skills_list, aliases=None):
+        self.skills = list(skills_list)
+        self.words = {}
+        self.phrases_by_first = {}
+        for index, skill in enumerate(self.skills):
+            self._add_phrase(skill, index)
+        positions = {skill: index for index, skill in enumerate(self.skills)}
+        for alias, skill in (aliases or {}).items():
+            if skill in positions:
+                self._add_phrase(alias, positions[skill])
+        phrases = [((word,), index) for word, index in self.words.items()]
+        phrases.extend(entry for candidates in self.phrases_by_first.values() for entry in candidates)
+        self.scans_text = len(phrases) <= SCAN_MAX_PHRASES
+        # (needle, boundary pattern, skill index); the needle is the phrase's first token.
+        self.scan_patterns = [(tokens[0], phrase_pattern(tokens), index) for tokens, index in phrases] if self.scans_text else []
+
+    def _add_phrase(self, phrase, index):
+        tokens = tuple(tokenize(phrase))
+        if not tokens:
+            return
+        if len(tokens) == 1:
+            self.words.setdefault(tokens[0], index)
+            return
+        candidates = self.phrases_by_first.setdefault(tokens[0], [])
+        if all(existing != tokens for existing, _ in candidates):
+            candidates.append((tokens, index))
+
+    def find_indexes(self, text):
+        if self.scans_text:
+            return self.find_indexes_in_text((text or "").lower())
+        tokens = tokenize(text)
+        return self.find_indexes_in_tokens(tokens, set(tokens))
+
+    def find_indexes_in_text(self, lower, among=None):
+        # ``among`` limits the scan to those skill indexes, e.g. the skills a job description asks for.
+        found = set()
+        for needle, pattern, index in self.scan_patterns:
+            if among is not None and index not in among:
+                continue
+            # str.find outruns re's own scan; the pattern only checks boundaries where the needle occurs.
+            position = lower.find(needle)
+            while position != -1:
+                if pattern.match(lower, position):
+                    found.add(index)
+                    break
+                position = lower.find(needle, position + 1)
+        return found
+
+    def find_indexes_in_tokens(self, tokens, token_set):
+        words = self.words
+        found = {words[token] for token in token_set.intersection(words)}
+        phrase_starts = token_set.intersection(self.phrases_by_first)
+        if phrase_starts:
+            phrases_by_first = self.phrases_by_first
+            for position, token in enumerate(tokens):
+                if token not in phrase_starts:
+                    continue
+                for phrase, index in phrases_by_first[token]:
+                    if tuple(tokens[position:position + len(phrase)]) == phrase:
+                        found.add(index)
+        return found
+
+    def find(self, text):
+        return [self.skills[index] for index in sorted(self.find_indexes(text))]
+
+    def compare(self, resume_text, job_description):
+        jd_hits = self.find_indexes(job_description)
+        if not jd_hits:
+            return [], []
+        if self.scans_text:
+            return self.compare_hits(self.find_indexes_in_text((resume_text or "").lower(), jd_hits), jd_hits)
+        return self.compare_hits(self.find_indexes(resume_text), jd_hits)
+
+    def compare_hits(self, resume_hits, jd_hits):
+        matched = []
+        missing = []
+        for index in sorted(jd_hits):
+            if index in resume_hits:
+                matched.append(self.skills[index])
+            else:
+                missing.append(self.skills[index])
+        return matched, missing
+
+
+_matchers = {}
+
+
+def get_skill_matcher(skills_list):
+    key = tuple(skills_list)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = SkillMatcher(key)
+        _matchers[key] = matcher
+    return matcher
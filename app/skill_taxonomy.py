@@ -0,0 +1,110 @@
+"""Skill taxonomy loaded from a JSON data file and swapped atomically when the file changes.
+
+Each version is compiled once into a SkillMatcher that also knows the
+aliases. A request takes a reference to the current Taxonomy and keeps using
+it even if a newer one is swapped in meanwhile. The file's mtime is checked
+at most every ``TAXONOMY_CHECK_INTERVAL`` seconds and changes are loaded on a
+background thread, so no request waits for a reload.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from app.skill_matcher import SkillMatcher
+
+TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(__file__), "skill_taxonomy.json"))
+TAXONOMY_CHECK_INTERVAL = float(os.getenv("SKILL_TAXONOMY_CHECK_INTERVAL", "5"))
+COMPILED_VERSIONS_KEPT = 4
+
+logger = logging.getLogger(__name__)
+_matchers = {}
+
+
+class Taxonomy:
+    def __init__(self, version, categories, aliases):
+        self.version = version
+        self.categories = categories
+        self.aliases = aliases
+        self.skills = tuple(skill for group in categories.values() for skill in group)
+
+    @property
+    def matcher(self):
+        # Keyed by version rather than stored on the instance, so a Taxonomy pickled into a
+        # worker process compiles there once per version instead of once per task.
+        matcher = _matchers.get(self.version)
+        if matcher is None:
+            matcher = SkillMatcher(self.skills, self.aliases)
+            _matchers[self.version] = matcher
+            while len(_matchers) > COMPILED_VERSIONS_KEPT:
+                _matchers.pop(next(iter(_matchers)))
+        return matcher
+
+
+def parse_taxonomy(raw):
+    # The version is a content hash, so editing the file is all it takes to publish a new one.
+    categories = {}
+    aliases = {}
+    for category, entries in json.loads(raw)["categories"].items():
+        categories[category] = [skill.lower() for skill in entries]
+        for skill, skill_aliases in entries.items():
+            for alias in skill_aliases:
+                aliases[alias.lower()] = skill.lower()
+    return Taxonomy(hashlib.sha256(raw).hexdigest()[:12], categories, aliases)
+
+
+class TaxonomyStore:
+    def __init__(self, path=TAXONOMY_PATH, check_interval=TAXONOMY_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._current = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._first_load = threading.Lock()
+        self._reloading = threading.Lock()
+
+    def load(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        self._mtime = mtime
+        with open(self.path, "rb") as f:
+            taxonomy = parse_taxonomy(f.read())
+        taxonomy.matcher  # compile before the swap makes it visible
+        self._current = taxonomy
+        self._checked_at = time.monotonic()
+        return taxonomy
+
+    def current(self):
+        taxonomy = self._current
+        if taxonomy is None:
+            with self._first_load:
+                return self._current or self.load()
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                changed = os.stat(self.path).st_mtime_ns != self._mtime
+            except OSError:
+                changed = False
+            if changed and self._reloading.acquire(blocking=False):
+                threading.Thread(target=self._reload, name="taxonomy-reload", daemon=True).start()
+        return taxonomy
+
+    def _reload(self):
+        previous = self._current
+        try:
+            taxonomy = self.load()
+            logger.info("Loaded skill taxonomy %s with %d skills", taxonomy.version, len(taxonomy.skills))
+        except Exception:
+            # load() already recorded the new mtime, so a broken file is not retried until it changes again.
+            logger.exception("Reloading %s failed; keeping taxonomy %s", self.path, previous.version)
+        finally:
+            self._reloading.release()
+
+
+taxonomy_store = TaxonomyStore()
+
+
+def get_taxonomy():
+    return taxonomy_store.current()
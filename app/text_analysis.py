@@ -0,0 +1,99 @@
+import re
+
+from app.skill_matcher import TOKEN_PATTERN
+from app.vector_scorer import term_vector
+
+EMAIL_PATTERN = re.compile(r"[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}")
+PHONE_PATTERN = re.compile(r"(\+\d{1,3}[\s-]?)?(\(?\d{3}\)?[\s-]?)\d{3}[\s-]?\d{4}")
+METRIC_PATTERN = re.compile(r"\d+%|\d+\+|\$\d+|\d+\s*(users|projects|clients|months|years)")
+ACTION_VERBS = ("built", "developed", "implemented", "designed", "optimized", "led", "improved", "delivered", "automated", "created")
+BULLET_PREFIXES = ("-", "*", "•")
+
+
+class ResumeDocument:
+    """One analysis pass over a document, shared by skill scoring and the quality audit.
+
+    The text is lowercased once. Lines, tokens, regex signals and skill hits
+    are computed on first use and then reused, so the quality audit never
+    pays for tokenizing and a small-taxonomy skill scan never does either.
+    """
+
+    def __init__(self, text):
+        self.text = text or ""
+        self.lower = self.text.lower()
+        self._tokens = None
+        self._token_set = None
+        self._lines = None
+        self._signals = None
+        self._skill_hits = {}
+        self._terms = None
+
+    @property
+    def lines(self):
+        # Only the quality audit needs lines, so a JD document never splits them.
+        if self._lines is None:
+            self._lines = [line.strip() for line in self.text.splitlines() if line.strip()]
+        return self._lines
+
+    @property
+    def tokens(self):
+        if self._tokens is None:
+            self._tokens = TOKEN_PATTERN.findall(self.lower)
+        return self._tokens
+
+    @property
+    def token_set(self):
+        if self._token_set is None:
+            self._token_set = set(self.tokens)
+        return self._token_set
+
+    @property
+    def bullets(self):
+        return [line.lower() for line in self.lines if line.startswith(BULLET_PREFIXES)]
+
+    @property
+    def terms(self):
+        # Hashed term vector for the no-skill fallback score.
+        if self._terms is None:
+            self._terms = term_vector(self.tokens)
+        return self._terms
+
+    @property
+    def signals(self):
+        if self._signals is None:
+            lower = self.lower
+            self._signals = {
+                "email": EMAIL_PATTERN.search(lower) is not None,
+                "phone": PHONE_PATTERN.search(lower) is not None,
+                "linkedin": "linkedin.com/in/" in lower,
+                "github": "github.com/" in lower,
+                "metrics": METRIC_PATTERN.search(lower) is not None,
+                "action_verbs": self._has_action_verb(),
+                "sections": "experience" in lower and "skills" in lower,
+            }
+        return self._signals
+
+    def _has_action_verb(self):
+        # Substring match like the original per-line loop; no verb spans a newline,
+        # so each verb is one C-level scan over all bullet lines at once.
+        bullet_text = "\n".join(self.bullets)
+        return any(verb in bullet_text for verb in ACTION_VERBS)
+
+    def skill_hits(self, matcher, among=None):
+        # ``among`` narrows a text scan to those skills (a JD's); the token path finds every skill anyway.
+        if matcher.scans_text and among is not None:
+            return matcher.find_indexes_in_text(self.lower, among)
+        hits = self._skill_hits.get(matcher)
+        if hits is None:
+            if matcher.scans_text:
+                hits = matcher.find_indexes_in_text(self.lower)
+            else:
+                hits = matcher.find_indexes_in_tokens(self.tokens, self.token_set)
+            self._skill_hits[matcher] = hits
+        return hits
+
+
+def as_document(text_or_document):
+    if isinstance(text_or_document, ResumeDocument):
+        return text_or_document
+    return ResumeDocument(text_or_document)
@@ -0,0 +1,103 @@
+import hashlib
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+from app.cache import LRUCache
+
+TEXT_CACHE_MAX_BYTES = int(os.getenv("TEXT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Path of a SQLite file shared by all workers; leave empty to keep the cache in-process only.
+TEXT_CACHE_DB = os.getenv("TEXT_CACHE_DB", "")
+TEXT_CACHE_DB_MAX_ROWS = int(os.getenv("TEXT_CACHE_DB_MAX_ROWS", "20000"))
+TEXT_CACHE_DB_TTL = int(os.getenv("TEXT_CACHE_DB_TTL", str(60 * 60 * 24 * 30)))
+TEXT_CACHE_PRUNE_EVERY = 200
+
+
+def text_cache_key(data, extractor_version, format_name):
+    # The format is part of the key because plain text is recognised by suffix, not by its bytes.
+    return f"{extractor_version}:{format_name}:{hashlib.sha256(data).hexdigest()}"
+
+
+class TextCache:
+    """Extracted resume text keyed by a hash of the upload bytes.
+
+    Entries live in an in-process LRU bounded by total text size. When a
+    database path is configured, misses fall through to a SQLite table so the
+    cache survives restarts and is shared between workers. The table is
+    pruned at startup and every ``TEXT_CACHE_PRUNE_EVERY`` writes: rows older
+    than ``ttl`` go first, then the oldest beyond ``max_rows``.
+    """
+
+    def __init__(self, max_bytes=TEXT_CACHE_MAX_BYTES, db_path=TEXT_CACHE_DB, max_rows=TEXT_CACHE_DB_MAX_ROWS, ttl=TEXT_CACHE_DB_TTL):
+        self.memory = LRUCache(max_bytes=max_bytes, sizeof=len)
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.db_hits = 0
+        self.pruned = 0
+        self._writes = itertools.count(1)
+        self._local = threading.local()
+        if db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS extracted_text_cache ("
+                    "key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS ix_extracted_text_cache_created_at ON extracted_text_cache(created_at)")
+            self.prune()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        text = self.memory.get(key)
+        if text is not None or not self.db_path:
+            return text
+        row = self._connect().execute(
+            "SELECT text FROM extracted_text_cache WHERE key = ? AND created_at >= ?", (key, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        self.db_hits += 1
+        self.memory.set(key, row[0])
+        return row[0]
+
+    def set(self, key, text):
+        self.memory.set(key, text)
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO extracted_text_cache (key, text, created_at) VALUES (?, ?, ?)",
+                    (key, text, time.time()),
+                )
+            if next(self._writes) % TEXT_CACHE_PRUNE_EVERY == 0:
+                self.prune()
+
+    def prune(self):
+        with self._connect() as conn:
+            expired = conn.execute("DELETE FROM extracted_text_cache WHERE created_at < ?", (time.time() - self.ttl,)).rowcount
+            overflow = conn.execute(
+                "DELETE FROM extracted_text_cache WHERE key IN ("
+                "SELECT key FROM extracted_text_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,),
+            ).rowcount
+        self.pruned += expired + overflow
+
+    def stats(self):
+        stats = self.memory.stats()
+        stats["db_hits"] = self.db_hits
+        stats["misses"] = stats["misses"] - self.db_hits
+        stats["hits"] = stats["hits"] + self.db_hits
+        stats["persistent"] = bool(self.db_path)
+        stats["db_pruned"] = self.pruned
+        return stats
+
+
+text_cache = TextCache()
@@ -1,113 +1,178 @@
-from PyPDF2 import PdfReader
 from datetime import datetime
 import io
-import re
 import textwrap
 import zipfile
-from xml.etree import ElementTree as ET
-
-def extract_text_from_pdf(file):
-    reader = PdfReader(file)
-    text = ""
-    for page in reader.pages:
-        if page.extract_text():
-            text += page.extract_text()
+from app.cache import LRUCache
+from app.metrics import STAGE_SECONDS
+from app.extractors import (
+    EXTRACTOR_VERSION,
+    MAX_PDF_PAGES,
+    MAX_EXTRACT_CHARS,
+    iter_pdf_pages,
+    extract_text_from_pdf,
+    extract_text_from_txt,
+    extract_text_from_docx,
+    extract_text_from_odt,
+    extract_text_from_rtf,
+    extract_text_from_file,
+    detect_format_name,
+)
+from app.skill_matcher import get_skill_matcher, tokenize
+from app.singleflight import SingleFlight
+from app.skill_taxonomy import Taxonomy
+from app.text_analysis import ResumeDocument, as_document
+from app.text_cache import text_cache, text_cache_key
+from app.vector_scorer import score_matrix, term_vector
+
+JD_DOCUMENT_CACHE_SIZE = 64
+# Concurrent uploads of the same bytes, or batches screened against the same JD, share one pass.
+extraction_flight = SingleFlight()
+jd_flight = SingleFlight()
+jd_documents = LRUCache(max_items=JD_DOCUMENT_CACHE_SIZE)
+
+def extract_text_from_upload(upload_file):
+    return extract_text_from_file(upload_file.filename, upload_file.file)
+
+
+def extract_text_from_bytes(filename, data):
+    return extract_text_from_file(filename, io.BytesIO(data))
+
+
+def extract_text_cached(filename, data):
+    format_name = detect_format_name(filename, data)
+    if format_name is None:
+        # Raises the unsupported-type error without touching the cache.
+        return extract_text_from_bytes(filename, data)
+    key = text_cache_key(data, EXTRACTOR_VERSION, format_name)
+    text = text_cache.get(key)
+    if text is None:
+        text = extraction_flight.do(key, _extract_and_cache, key, filename, data)
     return text
 
 
-def extract_text_from_txt(file):
-    raw = file.read()
-    try:
-        return raw.decode("utf-8")
-    except UnicodeDecodeError:
-        return raw.decode("latin-1", errors="ignore")
-
-
-def extract_text_from_docx(file):
-    file.seek(0)
-    with zipfile.ZipFile(io.BytesIO(file.read())) as archive:
-        with archive.open("word/document.xml") as doc_xml:
-            xml_content = doc_xml.read()
-    root = ET.fromstring(xml_content)
-    text_nodes = []
-    for node in root.iter():
-        if node.tag.endswith("}t") and node.text:
-            text_nodes.append(node.text)
-    return " ".join(text_nodes)
-
-
-def extract_text_from_odt(file):
-    file.seek(0)
-    with zipfile.ZipFile(io.BytesIO(file.read())) as archive:
-        with archive.open("content.xml") as content_xml:
-            xml_content = content_xml.read()
-    root = ET.fromstring(xml_content)
-    text_nodes = []
-    for node in root.iter():
-        if node.text and node.text.strip():
-            text_nodes.append(node.text.strip())
-    return " ".join(text_nodes)
-
-
-def extract_text_from_rtf(file):
-    raw = file.read()
-    try:
-        text = raw.decode("utf-8")
-    except UnicodeDecodeError:
-        text = raw.decode("latin-1", errors="ignore")
-    text = re.sub(r"\\'[0-9a-fA-F]{2}", " ", text)
-    text = re.sub(r"\\[a-zA-Z]+\d* ?", " ", text)
-    text = re.sub(r"[{}]", " ", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+def _extract_and_cache(key, filename, data):
+    text = extract_text_from_bytes(filename, data)
+    text_cache.set(key, text)
+    return text
 
 
-def extract_text_from_upload(upload_file):
-    filename = (upload_file.filename or "").lower()
-    file_obj = upload_file.file
-    file_obj.seek(0)
-
-    if filename.endswith(".pdf"):
-        return extract_text_from_pdf(file_obj)
-    if filename.endswith(".txt") or filename.endswith(".md"):
-        return extract_text_from_txt(file_obj)
-    if filename.endswith(".docx"):
-        return extract_text_from_docx(file_obj)
-    if filename.endswith(".odt"):
-        return extract_text_from_odt(file_obj)
-    if filename.endswith(".rtf"):
-        return extract_text_from_rtf(file_obj)
-
-    raise ValueError("Unsupported file type. Use PDF, DOCX, ODT, TXT, MD, or RTF.")
+def jd_document(job_description):
+    # Tokenized JD shared by every resume scored against it; skill hits are memoized on the document.
+    document = jd_documents.get(job_description)
+    if document is None:
+        document = jd_flight.do(job_description, _build_jd_document, job_description)
+    return document
+
+
+def _build_jd_document(job_description):
+    # Checked again: an earlier leader for this JD may have finished since the caller missed.
+    document = jd_documents.get(job_description)
+    if document is None:
+        document = ResumeDocument(job_description)
+        jd_documents.set(job_description, document)
+    return document
 
 def clean_text(text):
     return text.lower()
 
 def calculate_similarity(resume_text, job_description, skills_list):
-    matched = []
-    missing = []
-    for skill in skills_list:
-        in_jd = skill in job_description
-        in_resume = skill in resume_text
-        if in_jd:
-            if in_resume:
-                matched.append(skill)
-            else:
-                missing.append(skill)
+    # Accepts plain strings or ResumeDocument objects that were already analyzed.
+    resume_doc = as_document(resume_text)
+    jd_doc = as_document(job_description)
+    matcher = skills_list.matcher if isinstance(skills_list, Taxonomy) else get_skill_matcher(skills_list)
+    jd_hits = jd_doc.skill_hits(matcher)
+    matched, missing = matcher.compare_hits(resume_doc.skill_hits(matcher, jd_hits), jd_hits) if jd_hits else ([], [])
     total_required = len(matched) + len(missing)
     if total_required == 0:
-        resume_words = set(resume_text.split())
-        jd_words = set(job_description.split())
-        stop_words = {"the","and","is","in","of","to","a","for","with","on","at","by","an","be","or","that","this","are","we","you","it","as","your","our"}
-        jd_words -= stop_words
-        if not jd_words:
-            return 0, [], []
-        matched_words = resume_words.intersection(jd_words)
-        score = round((len(matched_words) / len(jd_words)) * 100, 2)
-        return min(score, 100), [], []
+        score = score_matrix([resume_doc.terms], [jd_doc.terms])[0, 0]
+        return round(float(score), 2), [], []
     score = round((len(matched) / total_required) * 100, 2)
     return score, matched, missing
 
+def score_resume(filename, data, job_description, skills_list):
+    # Runs in the analysis worker pool, so it only takes and returns picklable values.
+    resume_text = extract_text_cached(filename, data)
+    if not resume_text:
+        return None
+    return score_resume_text(resume_text, job_description, skills_list)
+
+def score_resume_text(resume_text, job_description, skills_list):
+    resume_doc = ResumeDocument(resume_text)
+    with STAGE_SECONDS.time("skill_matching", ""):
+        similarity_score, matched_skills, missing_skills = calculate_similarity(
+            resume_doc, jd_document(job_description), skills_list
+        )
+    with STAGE_SECONDS.time("quality_audit", ""):
+        quality_audit = analyze_resume_quality(resume_doc)
+    return {
+        "score": similarity_score,
+        "matched": matched_skills,
+        "missing": missing_skills,
+        "quality_audit": quality_audit,
+    }
+
+SCREENING_SUFFIXES = (".pdf", ".docx", ".odt", ".txt", ".md", ".rtf")
+MAX_SCREENING_FILES = 500
+MAX_SCREENING_BYTES = 200 * 1024 * 1024
+MAX_SCREENING_FILE_BYTES = 20 * 1024 * 1024
+
+
+def check_screening_upload_size(filename, size):
+    # Checked against the spooled size before the upload is read into memory.
+    limit = MAX_SCREENING_BYTES if (filename or "").lower().endswith(".zip") else MAX_SCREENING_FILE_BYTES
+    if size > limit:
+        raise ValueError(f"{filename} is larger than {limit // (1024 * 1024)} MB.")
+
+
+def expand_screening_upload(filename, data):
+    if not (filename or "").lower().endswith(".zip"):
+        check_screening_upload_size(filename, len(data))
+        return [(filename, data)]
+    files = []
+    total_bytes = 0
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            base_name = info.filename.rsplit("/", 1)[-1]
+            if info.is_dir() or info.filename.startswith("__MACOSX/") or base_name.startswith("."):
+                continue
+            if not base_name.lower().endswith(SCREENING_SUFFIXES):
+                continue
+            if info.file_size > MAX_SCREENING_FILE_BYTES:
+                raise ValueError(f"{base_name} is larger than {MAX_SCREENING_FILE_BYTES // (1024 * 1024)} MB.")
+            total_bytes += info.file_size
+            if total_bytes > MAX_SCREENING_BYTES:
+                raise ValueError("ZIP archive is too large to screen in one batch.")
+            files.append((base_name, archive.read(info)))
+    return files
+
+
+def screen_resume(filename, data, job_description, taxonomy):
+    try:
+        resume_text = extract_text_cached(filename, data)
+    except ValueError as e:
+        return {"filename": filename, "error": str(e)}
+    except Exception:
+        return {"filename": filename, "error": "Could not read this document."}
+    if not resume_text:
+        return {"filename": filename, "error": "Could not read document content"}
+    resume_doc = ResumeDocument(resume_text)
+    jd_doc = jd_document(job_description)
+    with STAGE_SECONDS.time("skill_matching", ""):
+        if not jd_doc.skill_hits(taxonomy.matcher):
+            # No taxonomy skills to compare; score_screening_terms ranks the whole batch in one call.
+            return {"filename": filename, "terms": resume_doc.terms, "matched": [], "missing": [], "error": None}
+        score, matched, missing = calculate_similarity(resume_doc, jd_doc, taxonomy)
+    return {"filename": filename, "score": score, "matched": matched, "missing": missing, "error": None}
+
+def score_screening_terms(results, job_description):
+    scored = [result for result in results if "terms" in result]
+    if scored:
+        jd_terms = term_vector(tokenize(job_description))
+        scores = score_matrix([result.pop("terms") for result in scored], [jd_terms])[:, 0]
+        for result, score in zip(scored, scores):
+            result["score"] = round(float(score), 2)
+    return results
+
 def generate_career_suggestions(score, missing_skills):
     suggestions = []
     if score >= 80:
@@ -220,35 +285,20 @@ def build_report_text(user_email, score, matched_skills, missing_skills, action_
     return "\n".join(lines)
 
 
-def analyze_resume_quality(resume_text):
-    text = resume_text or ""
-    text_lower = text.lower()
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-
-    checks = []
+QUALITY_CHECKS = (
+    ("email", "Email present"),
+    ("phone", "Phone number present"),
+    ("linkedin", "LinkedIn profile included"),
+    ("github", "GitHub/portfolio link included"),
+    ("metrics", "Quantified impact metrics"),
+    ("action_verbs", "Action-oriented bullet points"),
+    ("sections", "Core sections (Skills + Experience)"),
+)
 
-    has_email = bool(re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", text))
-    checks.append({"label": "Email present", "passed": has_email})
 
-    has_phone = bool(re.search(r"(\+\d{1,3}[\s-]?)?(\(?\d{3}\)?[\s-]?)\d{3}[\s-]?\d{4}", text))
-    checks.append({"label": "Phone number present", "passed": has_phone})
-
-    has_linkedin = "linkedin.com/in/" in text_lower
-    checks.append({"label": "LinkedIn profile included", "passed": has_linkedin})
-
-    has_github = "github.com/" in text_lower
-    checks.append({"label": "GitHub/portfolio link included", "passed": has_github})
-
-    has_numbers = bool(re.search(r"\d+%|\d+\+|\$\d+|\d+\s*(users|projects|clients|months|years)", text_lower))
-    checks.append({"label": "Quantified impact metrics", "passed": has_numbers})
-
-    action_verbs = {"built", "developed", "implemented", "designed", "optimized", "led", "improved", "delivered", "automated", "created"}
-    bullet_lines = [line.lower() for line in lines if line.startswith(("-", "*", "•"))]
-    has_action_verbs = any(any(verb in line for verb in action_verbs) for line in bullet_lines)
-    checks.append({"label": "Action-oriented bullet points", "passed": has_action_verbs})
-
-    has_sections = ("experience" in text_lower) and ("skills" in text_lower)
-    checks.append({"label": "Core sections (Skills + Experience)", "passed": has_sections})
+def analyze_resume_quality(resume_text):
+    signals = as_document(resume_text).signals
+    checks = [{"label": label, "passed": signals[name]} for name, label in QUALITY_CHECKS]
 
     passed_count = sum(1 for item in checks if item["passed"])
     score = int(round((passed_count / len(checks)) * 100))
@@ -0,0 +1,80 @@
+"""BM25 term scoring over hashed sparse vectors, used when a JD names no taxonomy skills.
+
+Terms are hashed with crc32 rather than ``hash()`` so vectors built in
+different worker processes agree. A batch call maps every vector onto the
+compact vocabulary of the JD terms and scores all resumes against all JDs
+with a single matrix product. NumPy is only imported when a fallback score
+is actually needed.
+"""
+import zlib
+from collections import Counter
+
+# Bump whenever fallback scores change for the same input.
+SCORER_VERSION = "1"
+N_FEATURES = 1 << 20
+BM25_K1 = 1.2
+BM25_B = 0.75
+STOP_WORDS = frozenset(
+    "the and is in of to a for with on at by an be or that this are we you it as your our".split()
+)
+
+
+def term_vector(tokens):
+    """Hashed term frequencies as (feature ids, counts), sorted by id."""
+    import numpy as np
+
+    counts = Counter(token for token in tokens if token not in STOP_WORDS)
+    ids = np.fromiter(
+        (zlib.crc32(term.encode("utf-8")) % N_FEATURES for term in counts), dtype=np.int64, count=len(counts)
+    )
+    freqs = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    # Hash collisions fold into one feature.
+    ids, inverse = np.unique(ids, return_inverse=True)
+    return ids, np.bincount(inverse, weights=freqs, minlength=len(ids))
+
+
+def score_matrix(resume_vectors, jd_vectors):
+    """BM25 scores of every resume against every JD as an N x M array on a 0-100 scale.
+
+    IDF comes from the resume batch (uniform for a single resume). Scores are
+    normalized so a resume containing every JD term once at average length
+    scores 100, and capped there.
+    """
+    import numpy as np
+
+    n, m = len(resume_vectors), len(jd_vectors)
+    if not n or not m:
+        return np.zeros((n, m))
+    vocab = np.unique(np.concatenate([ids for ids, _ in jd_vectors]))
+    if not len(vocab):
+        return np.zeros((n, m))
+
+    # Term frequencies of the JD vocabulary only, for all resumes at once.
+    all_ids = np.concatenate([ids for ids, _ in resume_vectors])
+    all_freqs = np.concatenate([freqs for _, freqs in resume_vectors])
+    rows = np.repeat(np.arange(n), [len(ids) for ids, _ in resume_vectors])
+    positions = np.minimum(np.searchsorted(vocab, all_ids), len(vocab) - 1)
+    in_vocab = vocab[positions] == all_ids
+    tf = np.zeros((n, len(vocab)))
+    tf[rows[in_vocab], positions[in_vocab]] = all_freqs[in_vocab]
+
+    lengths = np.array([freqs.sum() for _, freqs in resume_vectors])
+    avg_length = lengths.mean() or 1.0
+    if n > 1:
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    else:
+        idf = np.ones(len(vocab))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_length)
+    weights = tf * (BM25_K1 + 1) / (tf + norm[:, None]) * idf
+
+    query = np.zeros((m, len(vocab)))
+    for row, (ids, _) in enumerate(jd_vectors):
+        query[row, np.searchsorted(vocab, ids)] = 1.0
+    ideal = query @ idf
+    scores = (weights @ query.T) / np.where(ideal > 0, ideal, 1.0)
+    return np.minimum(scores * 100, 100.0)
+
+
+def score_pair(resume_tokens, jd_tokens):
+    return float(score_matrix([term_vector(resume_tokens)], [term_vector(jd_tokens)])[0, 0])
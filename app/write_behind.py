@@ -0,0 +1,142 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy.exc import IntegrityError
+
+from app.auth_db import SessionLocal
+from app.metrics import STAGE_SECONDS
+
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL_MS", "50")) / 1000
+WRITE_BEHIND_BATCH = int(os.getenv("WRITE_BEHIND_BATCH", "200"))
+READ_YOUR_WRITES_TIMEOUT = 2.0
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Group-commit queue for insert-only rows.
+
+    Requests enqueue ``(model, values)`` and return immediately. A background
+    thread collects rows for up to ``interval`` seconds (or until ``batch_size``
+    rows are waiting) and inserts them in a single transaction, so SQLite pays
+    one fsync per batch instead of one per request. ``wait_for_user`` gives
+    read-your-writes to pages that list a user's rows.
+    """
+
+    def __init__(self, session_factory=SessionLocal, interval=WRITE_BEHIND_INTERVAL, batch_size=WRITE_BEHIND_BATCH):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.flushed_batches = 0
+        self.flushed_rows = 0
+        self._pending = []
+        self._pending_users = Counter()
+        self._flush_requested = False
+        self._stopping = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    def enqueue(self, model, values):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+            self._pending.append((model, values))
+            self._pending_users[values.get("user_id")] += 1
+            self._cond.notify_all()
+
+    def wait_for_user(self, user_id, timeout=READ_YOUR_WRITES_TIMEOUT):
+        with self._cond:
+            if not self._pending_users[user_id]:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._pending_users[user_id], timeout=timeout)
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+
+    @property
+    def depth(self):
+        return len(self._pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stopping)
+                if not self._pending:
+                    return
+                # Group-commit window: give concurrent requests a moment to join this batch.
+                deadline = time.monotonic() + self.interval
+                while len(self._pending) < self.batch_size and not self._flush_requested and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[: self.batch_size]
+                del self._pending[: self.batch_size]
+                self._flush_requested = bool(self._pending) and self._flush_requested
+            self._write(batch)
+            with self._cond:
+                for _, values in batch:
+                    self._pending_users[values.get("user_id")] -= 1
+                self._pending_users += Counter()  # drops users with nothing left pending
+                self._cond.notify_all()
+
+    def _write(self, batch):
+        db = self.session_factory()
+        try:
+            db.add_all([model(**values) for model, values in batch])
+            with STAGE_SECONDS.time("db_commit", ""):
+                db.commit()
+            self.flushed_batches += 1
+            self.flushed_rows += len(batch)
+        except Exception:
+            db.rollback()
+            logger.exception("Write-behind batch of %d rows failed; retrying rows one by one", len(batch))
+            for model, values in batch:
+                try:
+                    db.add(model(**values))
+                    db.commit()
+                    self.flushed_rows += 1
+                except IntegrityError:
+                    # A retried request whose idempotency key was already saved; the first row stands.
+                    db.rollback()
+                    logger.info("Skipping duplicate write-behind row for %s", model.__name__)
+                except Exception:
+                    db.rollback()
+                    logger.exception("Dropping write-behind row for %s", model.__name__)
+        finally:
+            db.close()
+
+
+write_behind = WriteBehindQueue()
+
+
+def insert_row(db, model, values, skip_duplicate=False):
+    # Queue the insert when write-behind is on, otherwise write it in the caller's session right away.
+    if WRITE_BEHIND_ENABLED:
+        write_behind.enqueue(model, values)
+        return
+    db.add(model(**values))
+    try:
+        with STAGE_SECONDS.time("db_commit", ""):
+            db.commit()
+    except IntegrityError:
+        db.rollback()
+        if not skip_duplicate:
+            raise
+
+
+def wait_for_user_writes(user_id):
+    if WRITE_BEHIND_ENABLED:
+        write_behind.wait_for_user(user_id)
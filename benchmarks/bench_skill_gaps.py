@@ -0,0 +1,75 @@
+"""Top missing skills for one user: GROUP BY over analysis_skill vs splitting strings in Python.
+
+    python -m benchmarks.bench_skill_gaps
+"""
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.auth_db import Analysis, AnalysisSkill, Base, Skill, SKILL_MATCHED, SKILL_MISSING
+from app.main import load_skill_gaps
+from app.skill_taxonomy import get_taxonomy
+
+ALL_SKILLS = list(get_taxonomy().skills)
+
+
+def legacy_gaps(db, user_id):
+    counts = Counter()
+    for (missing,) in db.query(Analysis.missing_skills).filter(Analysis.user_id == user_id):
+        counts.update(skill for skill in (missing or "").split(", ") if skill)
+    return counts.most_common(8)
+
+
+def populate(engine, analyses, users):
+    random.seed(5)
+    with engine.begin() as conn:
+        conn.execute(insert(Skill), [{"id": index + 1, "name": name} for index, name in enumerate(ALL_SKILLS)])
+        for start in range(0, analyses, 50000):
+            rows, skill_rows = [], []
+            for analysis_id in range(start + 1, min(start + 50000, analyses) + 1):
+                user_id = 1 if analysis_id % 2 else random.randint(2, users)
+                created_at = f"2026-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
+                picked = random.sample(range(len(ALL_SKILLS)), 8)
+                matched, missing = picked[:4], picked[4:]
+                rows.append({
+                    "id": analysis_id, "user_id": user_id, "score": 50.0, "created_at": created_at,
+                    "matched_skills": ", ".join(ALL_SKILLS[i] for i in matched),
+                    "missing_skills": ", ".join(ALL_SKILLS[i] for i in missing),
+                })
+                for indexes, status in ((matched, SKILL_MATCHED), (missing, SKILL_MISSING)):
+                    skill_rows.extend(
+                        {"analysis_id": analysis_id, "skill_id": i + 1, "status": status, "user_id": user_id, "created_at": created_at}
+                        for i in indexes
+                    )
+            conn.execute(insert(Analysis), rows)
+            conn.execute(insert(AnalysisSkill), skill_rows)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def run(analyses=250000, users=50):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, analyses, users)
+        db = sessionmaker(bind=engine)()
+        legacy_ms, legacy = timed(lambda: legacy_gaps(db, 1))
+        sql_ms, gaps = timed(lambda: load_skill_gaps(db, 1))
+        assert [count for _, count in legacy] == [gap["total"] for gap in gaps]
+        print(f"analyses={analyses} skill rows={analyses * 8} (user 1 owns half)")
+        print(f"python split: {legacy_ms:.0f} ms   GROUP BY on covering index: {sql_ms:.0f} ms")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    run()
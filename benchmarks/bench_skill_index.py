@@ -0,0 +1,65 @@
+"""Boolean candidate search: skill bitmaps vs loading and splitting every stored row.
+
+    python -m benchmarks.bench_skill_index
+"""
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.auth_db import Analysis, Base
+from app.skill_taxonomy import get_taxonomy
+from app.skill_index import SkillIndex, split_skills
+
+ALL_SKILLS = list(get_taxonomy().skills)
+HAVE, LACK = ["docker", "kubernetes"], ["aws"]
+
+
+def legacy_search(session_factory, owner_id):
+    db = session_factory()
+    try:
+        hits = []
+        for row in db.query(Analysis).filter(Analysis.user_id == owner_id).all():
+            matched = set(split_skills(row.matched_skills))
+            if all(skill in matched for skill in HAVE) and not any(skill in matched for skill in LACK):
+                hits.append(row.id)
+        return hits
+    finally:
+        db.close()
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def run(rows=200000):
+    random.seed(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Analysis),
+                [
+                    {"user_id": random.randint(1, 5), "score": 50.0, "matched_skills": ", ".join(random.sample(ALL_SKILLS, 8))}
+                    for _ in range(rows)
+                ],
+            )
+        session_factory = sessionmaker(bind=engine)
+        index = SkillIndex(session_factory, seed_skills=ALL_SKILLS)
+        build_ms, _ = timed(index.refresh)
+        legacy_ms, legacy_hits = timed(lambda: legacy_search(session_factory, 1))
+        search_ms, (total, _) = timed(lambda: index.search(HAVE, LACK, owner_id=1))
+        assert total == len(legacy_hits)
+        print(f"rows={rows} index bytes={index.stats()['bytes']} build={build_ms:.0f} ms")
+        print(f"load+split: {legacy_ms:.1f} ms   bitmap search: {search_ms:.2f} ms   ({total} matches)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    run()
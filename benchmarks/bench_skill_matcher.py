@@ -0,0 +1,100 @@
+"""Compare the compiled skill matcher with the original substring loop.
+
+The matcher scans for substrings at the bundled taxonomy size and tokenizes
+above ``SKILL_SCAN_MAX_PHRASES``; the ``path`` column shows which one ran.
+The second table times both paths on the same inputs around the threshold,
+which is where its default comes from.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_skill_matcher
+"""
+import random
+import timeit
+
+from app.skill_taxonomy import get_taxonomy
+from app import skill_matcher
+from app.skill_matcher import SkillMatcher
+
+BASE_SKILLS = list(get_taxonomy().skills)
+WORDS = (
+    "built developed designed services pipelines using team product customers data platform "
+    "javascript github mysql reporting scale latency reliability cloud migration dashboards"
+).split()
+
+
+def legacy_compare(resume_text, job_description, skills_list):
+    matched = []
+    missing = []
+    for skill in skills_list:
+        if skill in job_description:
+            if skill in resume_text:
+                matched.append(skill)
+            else:
+                missing.append(skill)
+    return matched, missing
+
+
+def synthetic_skills(count):
+    generated = list(BASE_SKILLS)
+    index = 0
+    while len(generated) < count:
+        generated.append(f"skill{index} {random.choice(WORDS)}" if index % 3 == 0 else f"skill{index}")
+        index += 1
+    return generated
+
+
+def synthetic_document(word_count, skills_list):
+    words = []
+    for _ in range(word_count):
+        if random.random() < 0.05:
+            words.append(random.choice(skills_list))
+        else:
+            words.append(random.choice(WORDS))
+    return " ".join(words)
+
+
+def run(skill_counts=(40, 1000, 10000), word_count=1500, repeat=5, number=20):
+    random.seed(7)
+    print(f"{'skills':>8} {'path':>7} {'legacy ms':>12} {'matcher ms':>12} {'speedup':>9}")
+    for count in skill_counts:
+        skills_list = synthetic_skills(count)
+        resume_text = synthetic_document(word_count, skills_list)
+        job_description = synthetic_document(word_count // 3, skills_list)
+        matcher = SkillMatcher(skills_list)
+        legacy = min(timeit.repeat(lambda: legacy_compare(resume_text, job_description, skills_list), repeat=repeat, number=number))
+        compiled = min(timeit.repeat(lambda: matcher.compare(resume_text, job_description), repeat=repeat, number=number))
+        legacy_ms = legacy / number * 1000
+        compiled_ms = compiled / number * 1000
+        path = "scan" if matcher.scans_text else "tokens"
+        print(f"{count:>8} {path:>7} {legacy_ms:>12.3f} {compiled_ms:>12.3f} {legacy_ms / compiled_ms:>8.1f}x")
+
+
+
+def matcher_with_path(skills_list, scan):
+    threshold = skill_matcher.SCAN_MAX_PHRASES
+    skill_matcher.SCAN_MAX_PHRASES = len(skills_list) * 2 if scan else 0
+    try:
+        return SkillMatcher(skills_list)
+    finally:
+        skill_matcher.SCAN_MAX_PHRASES = threshold
+
+
+def crossover(skill_counts=(40, 80, 120, 160, 200, 300), word_count=1500, repeat=7, number=50):
+    random.seed(7)
+    print(f"{'skills':>8} {'scan ms':>12} {'tokens ms':>12}")
+    for count in skill_counts:
+        skills_list = synthetic_skills(count)
+        resume_text = synthetic_document(word_count, skills_list)
+        job_description = synthetic_document(word_count // 3, skills_list)
+        timings = []
+        for scan in (True, False):
+            matcher = matcher_with_path(skills_list, scan)
+            timings.append(min(timeit.repeat(lambda: matcher.compare(resume_text, job_description), repeat=repeat, number=number)) / number * 1000)
+        print(f"{count:>8} {timings[0]:>12.3f} {timings[1]:>12.3f}")
+
+
+if __name__ == "__main__":
+    run()
+    print()
+    crossover()
@@ -0,0 +1,87 @@
+"""Per-request CPU for scoring + quality audit.
+
+"baseline" is the original per-skill substring scan plus the standalone audit,
+"separate" runs the skill matcher but still audits the raw text on its own,
+"shared" builds one ResumeDocument that both consume and reuses the job
+description's document across calls, as score_resume_text does.
+
+    python -m benchmarks.bench_text_analysis
+"""
+import random
+import re
+import time
+
+from app.skill_taxonomy import get_taxonomy
+from app.skill_matcher import get_skill_matcher
+from app.text_analysis import ResumeDocument
+from app.utils import analyze_resume_quality, calculate_similarity, jd_document
+
+ALL_SKILLS = list(get_taxonomy().skills)
+
+
+def legacy_quality_audit(resume_text):
+    text = resume_text or ""
+    text_lower = text.lower()
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    checks = []
+    checks.append({"label": "Email present", "passed": bool(re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", text))})
+    checks.append({"label": "Phone number present", "passed": bool(re.search(r"(\+\d{1,3}[\s-]?)?(\(?\d{3}\)?[\s-]?)\d{3}[\s-]?\d{4}", text))})
+    checks.append({"label": "LinkedIn profile included", "passed": "linkedin.com/in/" in text_lower})
+    checks.append({"label": "GitHub/portfolio link included", "passed": "github.com/" in text_lower})
+    checks.append({"label": "Quantified impact metrics", "passed": bool(re.search(r"\d+%|\d+\+|\$\d+|\d+\s*(users|projects|clients|months|years)", text_lower))})
+    action_verbs = {"built", "developed", "implemented", "designed", "optimized", "led", "improved", "delivered", "automated", "created"}
+    bullet_lines = [line.lower() for line in lines if line.startswith(("-", "*", "•"))]
+    checks.append({"label": "Action-oriented bullet points", "passed": any(any(verb in line for verb in action_verbs) for line in bullet_lines)})
+    checks.append({"label": "Core sections (Skills + Experience)", "passed": ("experience" in text_lower) and ("skills" in text_lower)})
+    passed_count = sum(1 for item in checks if item["passed"])
+    return {"score": int(round((passed_count / len(checks)) * 100)), "checks": checks}
+
+
+def baseline(resume_text, job_description):
+    resume_lower, jd_lower = resume_text.lower(), job_description.lower()
+    matched, missing = [], []
+    for skill in ALL_SKILLS:
+        if skill in jd_lower:
+            (matched if skill in resume_lower else missing).append(skill)
+    return matched, missing, legacy_quality_audit(resume_text)
+
+
+def separate(resume_text, job_description):
+    matched, missing = get_skill_matcher(ALL_SKILLS).compare(resume_text.lower(), job_description.lower())
+    return matched, missing, legacy_quality_audit(resume_text)
+
+
+def shared(resume_text, job_description):
+    resume_doc = ResumeDocument(resume_text)
+    result = calculate_similarity(resume_doc, jd_document(job_description), ALL_SKILLS)
+    return result, analyze_resume_quality(resume_doc)
+
+
+def synthetic_resume(lines):
+    random.seed(3)
+    words = "team platform services customers data reporting migration latency reliability".split()
+    body = ["Jane Doe", "jane@example.com | +1 555 123 4567", "EXPERIENCE", "SKILLS: " + ", ".join(ALL_SKILLS[:15])]
+    for _ in range(lines):
+        phrase = " ".join(random.choice(words + ALL_SKILLS) for _ in range(12))
+        body.append(f"- Worked on {phrase} for {random.randint(2, 90)} clients")
+    return "\n".join(body)
+
+
+def cpu_ms(fn, args, number):
+    started = time.process_time()
+    for _ in range(number):
+        fn(*args)
+    return (time.process_time() - started) / number * 1000
+
+
+def run(number=300):
+    job_description = "We need python, sql, docker, aws and kubernetes with strong communication. " * 5
+    print(f"{'resume lines':>12} {'baseline ms':>12} {'separate ms':>12} {'shared ms':>10}")
+    for lines in (20, 100, 400):
+        resume_text = synthetic_resume(lines)
+        timings = [cpu_ms(fn, (resume_text, job_description), number) for fn in (baseline, separate, shared)]
+        print(f"{lines:>12} {timings[0]:>12.3f} {timings[1]:>12.3f} {timings[2]:>10.3f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,54 @@
+"""Fallback scoring for a screening batch: per-resume calls vs one score_matrix call.
+
+Screening workers build the term vectors in parallel, so "matrix" is what the
+request itself waits for after extraction.
+
+    python -m benchmarks.bench_vector_scorer
+"""
+import random
+import time
+
+from app.skill_matcher import tokenize
+from app.vector_scorer import score_matrix, score_pair, term_vector
+
+WORDS = (
+    "gardening horticulture landscaping irrigation nursery planting pruning soil compost greenhouse "
+    "seasonal crews schedules clients estimates budgets equipment safety design maintenance"
+).split()
+
+
+def legacy_score(resume_text, job_description):
+    stop_words = {"the","and","is","in","of","to","a","for","with","on","at","by","an","be","or","that","this","are","we","you","it","as","your","our"}
+    jd_words = set(job_description.split()) - stop_words
+    return min(round(len(set(resume_text.split()) & jd_words) / len(jd_words) * 100, 2), 100)
+
+
+def corpus(count, words_per_resume):
+    random.seed(7)
+    return [" ".join(random.choice(WORDS) for _ in range(words_per_resume)) for _ in range(count)]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def run():
+    job_description = "We need a crew lead for landscaping design, irrigation and greenhouse maintenance with budgets"
+    score_pair(["warm"], ["up"])  # keep the one-off NumPy import out of the timings
+    print(f"{'resumes':>8} {'set loop ms':>12} {'pair loop ms':>13} {'vectors ms':>11} {'matrix ms':>10}")
+    for count in (50, 500):
+        resumes = corpus(count, 600)
+        token_lists = [tokenize(text) for text in resumes]
+        jd_tokens = tokenize(job_description)
+        set_loop = timed(lambda: [legacy_score(text, job_description) for text in resumes])
+        pair_loop = timed(lambda: [score_pair(tokens, jd_tokens) for tokens in token_lists])
+        vectors = []
+        build = timed(lambda: vectors.extend(term_vector(tokens) for tokens in token_lists))
+        matrix = timed(lambda: score_matrix(vectors, [term_vector(jd_tokens)]))
+        print(f"{count:>8} {set_loop:>12.2f} {pair_loop:>13.2f} {build:>11.2f} {matrix:>10.2f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,131 @@
+"""Synthetic resume and job-description corpus in every format the extractors accept.
+
+Documents are deterministic for a given seed, so two runs time the same
+bytes. PDF and DOCX are written with the app's own exporters, ODT and RTF by
+hand. A page is ``LINES_PER_PAGE`` lines, which fills one PDF page.
+
+    python -m benchmarks.corpus --out /tmp/corpus --pages 1 5 20 50
+"""
+import argparse
+import io
+import os
+import random
+import textwrap
+import zipfile
+from xml.sax.saxutils import escape
+
+from app.skill_taxonomy import get_taxonomy
+from app.utils import build_ats_resume_docx_bytes, build_ats_resume_pdf_bytes
+
+FORMATS = ("pdf", "docx", "odt", "rtf", "txt")
+PAGE_SIZES = (1, 5, 20, 50)
+LINES_PER_PAGE = 48
+MAX_LINE_CHARS = 90
+SKILLS = list(get_taxonomy().skills)
+WORDS = (
+    "team platform services customers data reporting migration latency reliability pipelines "
+    "dashboards stakeholders roadmap budget onboarding releases incidents automation quality"
+).split()
+VERBS = ("Built", "Developed", "Led", "Improved", "Designed", "Automated", "Delivered", "Maintained")
+SECTIONS = ("EXPERIENCE", "PROJECTS", "EDUCATION", "CERTIFICATIONS")
+
+ODT_MANIFEST = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="1.2">'
+    '<manifest:file-entry manifest:full-path="/" manifest:media-type="application/vnd.oasis.opendocument.text"/>'
+    '<manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>'
+    "</manifest:manifest>"
+)
+ODT_CONTENT = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+    'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" office:version="1.2">'
+    "<office:body><office:text>{paragraphs}</office:text></office:body></office:document-content>"
+)
+
+
+def resume_text(pages, seed=0):
+    rng = random.Random(f"resume:{pages}:{seed}")
+    lines = [
+        "JORDAN AVERY",
+        "jordan.avery@example.com | +1 555 010 2030 | linkedin.com/in/jordanavery | github.com/javery",
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 15)),
+    ]
+    while len(lines) < pages * LINES_PER_PAGE:
+        if len(lines) % 20 == 4:
+            lines.append(SECTIONS[len(lines) // 20 % len(SECTIONS)])
+            continue
+        phrase = " ".join(rng.choice(WORDS + SKILLS) for _ in range(6))
+        line = f"- {rng.choice(VERBS)} {phrase} for {rng.randint(2, 90)} clients, cutting costs {rng.randint(5, 60)}%"
+        # Kept under the PDF exporter's wrap width so one line stays one line.
+        lines.append(textwrap.shorten(line, width=MAX_LINE_CHARS, placeholder=""))
+    return "\n".join(lines)
+
+
+def job_description(seed=0):
+    rng = random.Random(f"jd:{seed}")
+    required = rng.sample(SKILLS, 10)
+    duties = " ".join(rng.choice(WORDS) for _ in range(60))
+    return f"We are hiring an engineer with {', '.join(required)}. You will work on {duties}."
+
+
+def to_pdf(text):
+    return build_ats_resume_pdf_bytes(text)
+
+
+def to_docx(text):
+    return build_ats_resume_docx_bytes(text)
+
+
+def to_odt(text):
+    paragraphs = "".join(f"<text:p>{escape(line)}</text:p>" for line in text.splitlines())
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+        # The mimetype entry must come first and stay uncompressed.
+        archive.writestr(zipfile.ZipInfo("mimetype"), "application/vnd.oasis.opendocument.text")
+        archive.writestr("META-INF/manifest.xml", ODT_MANIFEST)
+        archive.writestr("content.xml", ODT_CONTENT.format(paragraphs=paragraphs))
+    return output.getvalue()
+
+
+def to_rtf(text):
+    body = "".join(line.replace("\\", "\\\\").replace("{", "\\{").replace("}", "\\}") + "\\par\n" for line in text.splitlines())
+    return ("{\\rtf1\\ansi\\deff0{\\fonttbl{\\f0 Helvetica;}}\\f0\\fs22\n" + body + "}").encode("latin-1", errors="replace")
+
+
+def to_txt(text):
+    return text.encode("utf-8")
+
+
+WRITERS = {"pdf": to_pdf, "docx": to_docx, "odt": to_odt, "rtf": to_rtf, "txt": to_txt}
+
+
+def build_corpus(pages=PAGE_SIZES, formats=FORMATS, seed=0):
+    """Return [(filename, format, pages, text, data)] for every size/format pair."""
+    documents = []
+    for page_count in pages:
+        text = resume_text(page_count, seed)
+        for fmt in formats:
+            documents.append((f"resume_{page_count}p.{fmt}", fmt, page_count, text, WRITERS[fmt](text)))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", required=True, help="directory to write the documents to")
+    parser.add_argument("--pages", type=int, nargs="+", default=list(PAGE_SIZES))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+    for filename, _, _, _, data in build_corpus(args.pages, args.formats, args.seed):
+        with open(os.path.join(args.out, filename), "wb") as f:
+            f.write(data)
+    with open(os.path.join(args.out, "job_description.txt"), "w", encoding="utf-8") as f:
+        f.write(job_description(args.seed))
+    print(f"Wrote {len(args.pages) * len(args.formats)} documents to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
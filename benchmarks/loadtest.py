@@ -0,0 +1,304 @@
+"""Load generator that runs scripted user journeys against the app and reports per-route latency.
+
+Each virtual user registers, logs in and then repeats a journey: upload page,
+``/analyze/`` with a corpus document, dashboard, report and ATS resume
+downloads, and the applications page. ``--users`` journeys run concurrently.
+The report gives throughput and p50/p95/p99 per route, plus error counts;
+5xx responses under load usually mean admission control or SQLite lock
+contention.
+
+Targets:
+
+    python -m benchmarks.loadtest --users 20 --iterations 5              # in-process over ASGI
+    python -m benchmarks.loadtest --uvicorn --workers 4 --users 50       # spawned local uvicorn
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --users 10 # an already running server
+
+In-process and ``--uvicorn`` runs use a fresh SQLite database in a temporary
+directory, so runs are isolated from each other and from ``users.db``. In
+process, an event-loop lag probe also reports how long the loop was blocked,
+which is the signal for synchronous work leaking into async routes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+LAG_PROBE_INTERVAL = 0.01
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer with python, sql, docker, aws, kubernetes and rest api experience. "
+    "Strong communication and teamwork, agile delivery and git workflows."
+)
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile; exact for the small samples a local run produces.
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client, route, method, url, ok=(200, 202, 303, 304), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            self.latencies[route].append(time.perf_counter() - started)
+            self.errors[route] += 1
+            self.statuses[route]["exception"] += 1
+            return None
+        self.latencies[route].append(time.perf_counter() - started)
+        self.statuses[route][str(response.status_code)] += 1
+        # A redirect to /login means the session was lost, e.g. workers that do not share sessions.
+        if response.status_code not in ok or response.headers.get("location") == "/login":
+            self.errors[route] += 1
+        return response
+
+    def report(self, elapsed):
+        rows = {}
+        for route, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            rows[route] = {
+                "requests": len(values),
+                "errors": self.errors[route],
+                "throughput_rps": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+                "statuses": dict(self.statuses[route]),
+            }
+        return rows
+
+
+async def journey(client, recorder, user_number, iterations, documents):
+    email = f"load{user_number}-{os.getpid()}@example.com"
+    credentials = {"email": email, "password": "load-test-password"}
+    await recorder.request(client, "POST /register/job-seeker", "POST", "/register/job-seeker", data=credentials)
+    await recorder.request(client, "POST /login/job-seeker", "POST", "/login/job-seeker", data=credentials)
+    for iteration in range(iterations):
+        filename, data = documents[(user_number + iteration) % len(documents)]
+        await recorder.request(client, "GET /upload", "GET", "/upload")
+        await recorder.request(
+            client,
+            "POST /analyze/",
+            "POST",
+            "/analyze/",
+            files={"resume": (filename, data, "application/octet-stream")},
+            data={"job_description": JOB_DESCRIPTION},
+        )
+        await recorder.request(client, "GET /dashboard", "GET", "/dashboard")
+        await recorder.request(client, "GET /download-report", "GET", "/download-report")
+        await recorder.request(
+            client,
+            "POST /ats-resume",
+            "POST",
+            "/ats-resume",
+            data={"full_name": f"Load User {user_number}", "email": email, "skills": "python, sql, docker", "experience": "Built services"},
+        )
+        await recorder.request(client, "GET /download-ats-resume-pdf", "GET", "/download-ats-resume-pdf")
+        await recorder.request(client, "GET /download-ats-resume-docx", "GET", "/download-ats-resume-docx")
+        await recorder.request(
+            client,
+            "POST /applications",
+            "POST",
+            "/applications",
+            data={"company": f"Company {iteration}", "role": "Backend Engineer"},
+        )
+        await recorder.request(client, "GET /applications", "GET", "/applications")
+
+
+async def lag_probe(samples, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        samples.append(max(0.0, loop.time() - started - LAG_PROBE_INTERVAL))
+
+
+async def drive(make_client, users, iterations, documents, probe_lag):
+    import httpx
+
+    recorder = Recorder()
+    lag = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(lag_probe(lag, stop)) if probe_lag else None
+    started = time.perf_counter()
+
+    async def one_user(user_number):
+        # One client per user so each keeps its own session cookie.
+        async with make_client() as client:
+            await journey(client, recorder, user_number, iterations, documents)
+
+    try:
+        await asyncio.gather(*(one_user(number) for number in range(users)))
+    except httpx.HTTPError as e:
+        print(f"Load test aborted: {e}", file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    if probe is not None:
+        await probe
+    return recorder, elapsed, sorted(lag)
+
+
+def load_documents(pages, formats):
+    from benchmarks.corpus import build_corpus
+
+    return [(filename, data) for filename, _, _, _, data in build_corpus(pages, formats)]
+
+
+def isolated_environment(workdir):
+    return {
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'loadtest.db')}",
+        "SESSION_DB": os.path.join(workdir, "sessions.db"),
+        "ANALYSIS_JOB_SPOOL_DIR": os.path.join(workdir, "job_spool"),
+        "PROFILE_DIR": os.path.join(workdir, "profiles"),
+    }
+
+
+async def run_in_process(args, documents):
+    import httpx
+
+    # Imported only after DATABASE_URL points at the temporary database.
+    from app.main import app
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        make_client = lambda: httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout)
+        return await drive(make_client, args.users, args.iterations, documents, probe_lag=True)
+    finally:
+        await app.router.shutdown()
+
+
+async def run_against_url(args, url, documents):
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.users * 2)
+    make_client = lambda: httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits)
+    return await drive(make_client, args.users, args.iterations, documents, probe_lag=False)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_uvicorn(workers, env):
+    if workers > 1:
+        # In-memory sessions are per process; every worker has to see the session created at login.
+        env.setdefault("SESSION_BACKEND", "sqlite")
+    # Migrate once up front; several workers migrating a fresh database at once would race.
+    subprocess.run([sys.executable, "-m", "app.migrations"], env=env, check=True, stdout=subprocess.DEVNULL)
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return server, f"http://127.0.0.1:{port}"
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited before it started listening")
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start listening within 30 seconds")
+
+
+def print_report(rows, elapsed, lag, target):
+    total = sum(row["requests"] for row in rows.values())
+    errors = sum(row["errors"] for row in rows.values())
+    print(f"\n{target}: {total} requests in {elapsed:.2f} s ({total / elapsed:.1f} req/s), {errors} errors\n")
+    print(f"{'route':<34} {'reqs':>6} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for route, row in rows.items():
+        print(
+            f"{route:<34} {row['requests']:>6} {row['errors']:>5} {row['throughput_rps']:>8.1f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+    if lag:
+        print(
+            f"\nEvent-loop lag: p50 {percentile(lag, 50) * 1000:.1f} ms, p99 {percentile(lag, 99) * 1000:.1f} ms, "
+            f"max {lag[-1] * 1000:.1f} ms over {len(lag)} probes"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="base URL of a running server (its database is not isolated)")
+    target.add_argument("--uvicorn", action="store_true", help="spawn a local uvicorn on a temporary database")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes with --uvicorn")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=5, help="journeys per user")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5], help="corpus document sizes to upload")
+    parser.add_argument("--formats", nargs="+", default=["pdf", "docx", "txt"])
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary database directory")
+    args = parser.parse_args(argv)
+
+    workdir = None
+    server = None
+    if not args.url:
+        workdir = tempfile.mkdtemp(prefix="resume-loadtest-")
+        os.environ.update(isolated_environment(workdir))
+    documents = load_documents(args.pages, args.formats)
+    try:
+        if args.url:
+            target_name = args.url
+            recorder, elapsed, lag = asyncio.run(run_against_url(args, args.url, documents))
+        elif args.uvicorn:
+            server, url = start_uvicorn(args.workers, dict(os.environ))
+            target_name = f"uvicorn x{args.workers}"
+            recorder, elapsed, lag = asyncio.run(run_against_url(args, url, documents))
+        else:
+            target_name = "in-process"
+            recorder, elapsed, lag = asyncio.run(run_in_process(args, documents))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+        if workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+        elif workdir:
+            print(f"Kept {workdir}")
+
+    rows = recorder.report(elapsed)
+    print_report(rows, elapsed, lag, target_name)
+    if args.json:
+        summary = {
+            "target": target_name,
+            "users": args.users,
+            "iterations": args.iterations,
+            "elapsed_s": round(elapsed, 3),
+            "routes": rows,
+            "event_loop_lag_ms": {
+                "p50": round(percentile(lag, 50) * 1000, 2),
+                "p99": round(percentile(lag, 99) * 1000, 2),
+                "max": round(lag[-1] * 1000, 2) if lag else 0.0,
+            },
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if any(row["errors"] for row in rows.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
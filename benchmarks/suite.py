@@ -0,0 +1,180 @@
+"""Hot-path benchmark suite with a stored baseline and regression thresholds.
+
+Times extraction for every format and size in the synthetic corpus, skill
+matching, the quality audit, the text report and the four PDF/DOCX exporters.
+Each case runs ``--repeat`` times after a warm-up and reports the median and
+fastest wall time. Results are written as JSON. When a baseline exists, each
+case whose median is more than its threshold slower is reported, and the
+process exits with status 1.
+
+    python -m benchmarks.suite                      # run, compare with benchmarks/baseline.json
+    python -m benchmarks.suite --update-baseline    # record this machine's baseline
+    python -m benchmarks.suite --quick --threshold 0.3 --case-threshold "extract/pdf/*=0.5"
+
+Baselines are machine-specific; record one on the machine that runs the comparison.
+"""
+import argparse
+import fnmatch
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.skill_taxonomy import get_taxonomy
+from app.utils import (
+    analyze_resume_quality,
+    build_ats_resume_docx_bytes,
+    build_ats_resume_pdf_bytes,
+    build_cover_letter_docx_bytes,
+    build_cover_letter_pdf_bytes,
+    build_report_text,
+    calculate_similarity,
+    extract_text_from_upload,
+    generate_action_plan,
+)
+from benchmarks.corpus import FORMATS, PAGE_SIZES, build_corpus, job_description
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_THRESHOLD = 0.25
+# Cases faster than this are dominated by timer noise and are never flagged.
+NOISE_FLOOR_MS = 0.05
+QUICK_PAGE_SIZES = (1, 5)
+
+
+def measure(fn, repeat):
+    fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": round(statistics.median(timings), 4), "min_ms": round(min(timings), 4), "runs": repeat}
+
+
+def upload(filename, data):
+    return SimpleNamespace(filename=filename, file=io.BytesIO(data))
+
+
+def cases(pages, formats):
+    # Yield (name, fn) pairs; every fn builds fresh inputs that need no cleanup between runs.
+    taxonomy = get_taxonomy()
+    jd = job_description()
+    documents = build_corpus(pages, formats)
+    for filename, fmt, page_count, _, data in documents:
+        yield f"extract/{fmt}/{page_count}p", lambda filename=filename, data=data: extract_text_from_upload(upload(filename, data))
+    texts = {page_count: text for _, _, page_count, text, _ in documents}
+    for page_count, text in texts.items():
+        yield f"similarity/{page_count}p", lambda text=text: calculate_similarity(text, jd, taxonomy)
+        yield f"quality_audit/{page_count}p", lambda text=text: analyze_resume_quality(text)
+    score, matched, missing = calculate_similarity(texts[min(texts)], jd, taxonomy)
+    action_plan = generate_action_plan(score, matched, missing)
+    yield "report_text", lambda: build_report_text("jordan.avery@example.com", score, matched, missing, action_plan)
+    export_text = texts[min(texts)]
+    for name, renderer in (
+        ("export/ats_resume_pdf", build_ats_resume_pdf_bytes),
+        ("export/ats_resume_docx", build_ats_resume_docx_bytes),
+        ("export/cover_letter_pdf", build_cover_letter_pdf_bytes),
+        ("export/cover_letter_docx", build_cover_letter_docx_bytes),
+    ):
+        yield name, lambda renderer=renderer: renderer(export_text)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(pages=PAGE_SIZES, formats=FORMATS, repeat=5, only=None):
+    results = {}
+    for name, fn in cases(pages, formats):
+        if only and not any(fnmatch.fnmatch(name, pattern) for pattern in only):
+            continue
+        results[name] = measure(fn, repeat)
+        print(f"{name:<32} {results[name]['median_ms']:>10.3f} ms  (min {results[name]['min_ms']:.3f})", flush=True)
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def threshold_for(name, default, overrides):
+    for pattern, value in overrides:
+        if fnmatch.fnmatch(name, pattern):
+            return value
+    return default
+
+
+def compare(current, baseline, default_threshold, overrides=()):
+    """Return [(name, baseline ms, current ms, allowed ratio)] for every case that slowed down too much."""
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None or result["median_ms"] < NOISE_FLOOR_MS:
+            continue
+        allowed = threshold_for(name, default_threshold, overrides)
+        if result["median_ms"] > previous["median_ms"] * (1 + allowed):
+            regressions.append((name, previous["median_ms"], result["median_ms"], allowed))
+    return regressions
+
+
+def parse_override(raw):
+    pattern, _, value = raw.partition("=")
+    if not value:
+        raise argparse.ArgumentTypeError("expected PATTERN=RATIO, e.g. extract/pdf/*=0.5")
+    return pattern, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write this run's results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="stored results to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run to --baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown as a ratio (0.25 = 25%%)")
+    parser.add_argument("--case-threshold", type=parse_override, action="append", default=[], help="PATTERN=RATIO override")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pages", type=int, nargs="+", default=None)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--only", nargs="+", help="glob patterns of case names to run")
+    parser.add_argument("--quick", action="store_true", help=f"only {', '.join(map(str, QUICK_PAGE_SIZES))} page documents")
+    args = parser.parse_args(argv)
+
+    pages = args.pages or (QUICK_PAGE_SIZES if args.quick else PAGE_SIZES)
+    current = run_suite(pages, args.formats, args.repeat, args.only)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+        return 0
+    regressions = compare(current, baseline, args.threshold, args.case_threshold)
+    for name, before, after, allowed in regressions:
+        print(f"REGRESSION {name}: {before:.3f} ms -> {after:.3f} ms (+{(after / before - 1) * 100:.0f}%, allowed {allowed * 100:.0f}%)")
+    if regressions:
+        return 1
+    print(f"No regressions against {args.baseline} ({baseline['meta'].get('commit') or 'unknown commit'}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
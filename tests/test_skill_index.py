@@ -0,0 +1,14 @@
+from app.skill_index import parse_skill_query
+
+
+def test_parse_skill_query_normalizes_terms():
+    assert parse_skill_query(" Docker ,, Machine   Learning,", aliases={}) == ["docker", "machine learning"]
+
+
+def test_parse_skill_query_resolves_aliases():
+    aliases = {"k8s": "kubernetes", "postgres": "postgresql"}
+    assert parse_skill_query("K8s, postgres, python", aliases=aliases) == ["kubernetes", "postgresql", "python"]
+
+
+def test_parse_skill_query_uses_bundled_taxonomy_aliases():
+    assert parse_skill_query("k8s, Postgres") == ["kubernetes", "postgresql"]